@@ -111,6 +111,16 @@ class ConfigManager:
         """
         set_nested_value(self.config, key, value)
 
+    def update(self, values: Dict[str, Any]) -> None:
+        """
+        Set several configuration values using dot notation.
+
+        Args:
+            values: Mapping of dot-notation keys to values
+        """
+        for key, value in values.items():
+            set_nested_value(self.config, key, value)
+
     def delete(self, key: str) -> bool:
         """
         Delete configuration value using dot notation.
@@ -142,10 +152,13 @@ class ConfigManager:
             return
 
         phase_path = f"phases.{phase_key}"
-        self.set(f"{phase_path}.completed", True)
-        self.set(f"{phase_path}.date_completed", get_timestamp())
+        updates: Dict[str, Any] = {
+            f"{phase_path}.completed": True,
+            f"{phase_path}.date_completed": get_timestamp(),
+        }
         if notes:
-            self.set(f"{phase_path}.notes", notes)
+            updates[f"{phase_path}.notes"] = notes
+        self.update(updates)
 
         self.logger.info(f"Phase {phase_number} marked as complete")
 
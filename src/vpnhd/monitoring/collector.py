@@ -80,7 +80,9 @@ class MetricsCollector:
             metrics.vpn_server_uptime_seconds.set(uptime)
 
             # Server status (check if WireGuard interface exists)
-            result = await execute_command_async(["ip", "link", "show", interface], check=False)
+            result = await execute_command_async(
+                ["ip", "link", "show", interface], check=False, fast_spawn=True
+            )
             status = 1 if result.success else 0
             metrics.vpn_server_status.labels(interface=interface).set(status)
 
@@ -120,7 +122,9 @@ class MetricsCollector:
         """
         try:
             interface = self.config.get("network.vpn.interface", "wg0")
-            result = await execute_command_async(["wg", "show", interface, "peers"], check=False)
+            result = await execute_command_async(
+                ["wg", "show", interface, "peers"], check=False, fast_spawn=True
+            )
 
             if result.success:
                 peers = [line.strip() for line in result.stdout.strip().split("\n") if line.strip()]
@@ -137,7 +141,9 @@ class MetricsCollector:
             interface = self.config.get("network.vpn.interface", "wg0")
 
             # Get WireGuard statistics
-            result = await execute_command_async(["wg", "show", interface, "transfer"], check=False)
+            result = await execute_command_async(
+                ["wg", "show", interface, "transfer"], check=False, fast_spawn=True
+            )
 
             if not result.success:
                 return
@@ -225,7 +231,7 @@ class MetricsCollector:
 
             # Get latest handshakes
             result = await execute_command_async(
-                ["wg", "show", interface, "latest-handshakes"], check=False
+                ["wg", "show", interface, "latest-handshakes"], check=False, fast_spawn=True
             )
 
             if result.success:
@@ -253,7 +259,7 @@ class MetricsCollector:
 
             # Get endpoints
             result = await execute_command_async(
-                ["wg", "show", interface, "endpoints"], check=False
+                ["wg", "show", interface, "endpoints"], check=False, fast_spawn=True
             )
 
             if result.success:
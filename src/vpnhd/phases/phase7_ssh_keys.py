@@ -9,11 +9,15 @@ from ..crypto.ssh import (
     test_ssh_key_auth,
 )
 from ..system.ssh_config import SSHConfigManager
+from ..utils.constants import SSH_DIR, SSH_KEY_DEFAULT_TYPE
 from ..utils.logging import get_logger
 from .base import Phase
 
 logger = get_logger(__name__)
 
+# Default key location, resolved once from the cached home directory
+DEFAULT_SSH_KEY_PATH = SSH_DIR / f"id_{SSH_KEY_DEFAULT_TYPE}"
+
 
 class Phase7SSHKeys(Phase):
     """Phase 7: SSH Key Authentication Setup."""
@@ -43,7 +47,7 @@ class Phase7SSHKeys(Phase):
             self.show_introduction()
 
             # SSH key path
-            ssh_key_path = Path.home() / ".ssh" / "id_ed25519"
+            ssh_key_path = DEFAULT_SSH_KEY_PATH
 
             # Check if key exists
             if not ssh_key_path.exists():
@@ -65,8 +69,12 @@ class Phase7SSHKeys(Phase):
                 add_ssh_key_to_authorized_keys(public_key)
                 self.display.success("Key added to authorized_keys")
 
-            self.config.set("phases.phase7_ssh_keys.ssh_key_path", str(ssh_key_path))
-            self.config.set("security.ssh_key_auth_enabled", True)
+            self.config.update(
+                {
+                    "phases.phase7_ssh_keys.ssh_key_path": str(ssh_key_path),
+                    "security.ssh_key_auth_enabled": True,
+                }
+            )
 
             # Disable password authentication
             if self.prompts.confirm("Disable SSH password authentication?", default=False):
@@ -1,9 +1,5 @@
 """Phase 8: Security Hardening."""
 
-from pathlib import Path
-
-from jinja2 import Template
-
 from ..security.validators import is_valid_port
 from ..system.commands import execute_command
 from ..system.fail2ban_config import Fail2banConfigManager
@@ -51,21 +47,16 @@ class Phase8Security(Phase):
             self.show_introduction()
 
             pkg_mgr = PackageManager()
-            svc_mgr = ServiceManager()
 
-            # Install UFW
-            if not pkg_mgr.is_package_installed("ufw"):
-                self.display.info("Installing UFW...")
-                pkg_mgr.install_package("ufw")
+            # Install UFW and fail2ban in a single package manager transaction
+            self.display.info("Ensuring UFW and fail2ban are installed...")
+            _, failed = pkg_mgr.install_packages(["ufw", "fail2ban"])
+            if failed:
+                self.display.warning(f"Failed to install: {', '.join(failed)}")
 
             # Configure UFW
             self._configure_ufw()
 
-            # Install fail2ban
-            if not pkg_mgr.is_package_installed("fail2ban"):
-                self.display.info("Installing fail2ban...")
-                pkg_mgr.install_package("fail2ban")
-
             # Configure fail2ban
             self._configure_fail2ban()
 
@@ -133,8 +124,12 @@ class Phase8Security(Phase):
         # Enable UFW
         execute_command(["ufw", "--force", "enable"], sudo=True, check=False)
 
-        self.config.set("security.firewall_enabled", True)
-        self.config.set("phases.phase8_security.ufw_configured", True)
+        self.config.update(
+            {
+                "security.firewall_enabled": True,
+                "phases.phase8_security.ufw_configured": True,
+            }
+        )
         self.display.success("UFW configured and enabled")
 
     def _configure_fail2ban(self) -> None:
@@ -159,10 +154,15 @@ class Phase8Security(Phase):
             find_time=600,
             max_retry=FAIL2BAN_SSH_MAX_RETRY,
             port=ssh_port,
+            defer_reload=True,
         ):
             self.display.success("✓ SSH jail configured")
-            self.config.set("security.fail2ban_ssh_jail_configured", True)
-            self.config.set("phases.phase8_security.ssh_jail_configured", True)
+            self.config.update(
+                {
+                    "security.fail2ban_ssh_jail_configured": True,
+                    "phases.phase8_security.ssh_jail_configured": True,
+                }
+            )
         else:
             self.display.warning("Failed to configure SSH jail")
 
@@ -173,17 +173,30 @@ class Phase8Security(Phase):
             find_time=600,
             max_retry=FAIL2BAN_WIREGUARD_MAX_RETRY,
             port=wg_port,
+            defer_reload=True,
         ):
             self.display.success("✓ WireGuard jail configured")
-            self.config.set("security.fail2ban_wireguard_jail_configured", True)
-            self.config.set("phases.phase8_security.wireguard_jail_configured", True)
+            self.config.update(
+                {
+                    "security.fail2ban_wireguard_jail_configured": True,
+                    "phases.phase8_security.wireguard_jail_configured": True,
+                }
+            )
         else:
             self.display.warning("Failed to configure WireGuard jail")
 
+        # Apply both jails with a single reload
+        if not fail2ban_mgr.flush_reload():
+            self.display.warning("Failed to reload fail2ban")
+
         # Final status
         if fail2ban_mgr.is_fail2ban_running():
-            self.config.set("security.fail2ban_enabled", True)
-            self.config.set("phases.phase8_security.fail2ban_configured", True)
+            self.config.update(
+                {
+                    "security.fail2ban_enabled": True,
+                    "phases.phase8_security.fail2ban_configured": True,
+                }
+            )
             self.display.success("fail2ban is running with custom jails")
             self.display.newline()
             self.display.info(
@@ -222,8 +235,12 @@ class Phase8Security(Phase):
             svc_mgr.disable_service("fail2ban")
             logger.info("fail2ban stopped")
 
-            self.config.set("security.firewall_enabled", False)
-            self.config.set("security.fail2ban_enabled", False)
+            self.config.update(
+                {
+                    "security.firewall_enabled": False,
+                    "security.fail2ban_enabled": False,
+                }
+            )
             self.config.save()
 
             return True
@@ -18,7 +18,7 @@ from .validators import (
     validate_email,
 )
 
-__all__ = [
+__all__ = (
     "is_valid_hostname",
     "is_valid_ip",
     "is_valid_ipv4",
@@ -30,4 +30,4 @@ __all__ = [
     "sanitize_hostname",
     "sanitize_filename",
     "validate_email",
-]
+)
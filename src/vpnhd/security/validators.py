@@ -4,17 +4,95 @@ This module provides comprehensive validation functions for all
 user inputs to prevent injection attacks and ensure data integrity.
 """
 
+import functools
 import ipaddress
 import re
-from pathlib import Path
-from typing import Optional
+import socket
+import string
+from pathlib import Path, PurePosixPath
+from typing import Any, Callable, Iterable, Optional, TypeVar
 
-from ..utils.constants import CIDR_PATTERN, HOSTNAME_PATTERN, IP_ADDRESS_PATTERN
+from ..utils.constants import IP_ADDRESS_PATTERN
 from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+_T = TypeVar("_T")
 
+# Validators below are pure functions of their (hashable) input and are re-run
+# with the same hostnames, addresses and keys on every reload and status poll
+_VALIDATION_CACHE_SIZE = 4096
+
+# Patterns are compiled once at import; validators run on every config load
+# Dot-separated labels of 1-63 alphanumerics/hyphens, no leading or trailing hyphen
+_HOSTNAME_RE = re.compile(
+    r"[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?"
+    r"(?:\.[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?)*"
+)
+_EMAIL_RE = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+_INTERFACE_NAME_RE = re.compile(r"^[a-zA-Z0-9._-]+$")
+_PACKAGE_NAME_RE = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9+._-]*$")
+_HOSTNAME_STRIP_RE = re.compile(r"[^a-z0-9-]")
+_FILENAME_STRIP_RE = re.compile(r"[^a-zA-Z0-9._-]")
+_INTERFACE_NAME_STRIP_RE = re.compile(r"[^a-zA-Z0-9._-]")
+_PACKAGE_NAME_STRIP_RE = re.compile(r"[^a-zA-Z0-9+._-]")
+
+# Cheap shape checks that reject obviously malformed addresses before parsing
+_IP_CHARS_RE = re.compile(r"[0-9A-Fa-f:.]{2,45}")
+_IPV4_SHAPE_RE = re.compile(IP_ADDRESS_PATTERN, re.ASCII)
+
+# Translation table that deletes every standard base64 alphabet character
+_WIREGUARD_KEY_STRIP = str.maketrans("", "", string.ascii_letters + string.digits + "+/")
+
+# MAC address in XX:XX:XX:XX:XX:XX or XX-XX-XX-XX-XX-XX form (always 17 chars)
+_MAC_ADDRESS_RE = re.compile(r"^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$")
+_MAC_ADDRESS_LENGTH = 17
+
+
+def _cached_str_validator(func: Callable[[Any], _T]) -> Callable[[Any], _T]:
+    """Memoize a single-argument validator for string inputs only.
+
+    Non-string arguments (including unhashable ones such as lists) bypass the
+    cache and reach the validator unchanged, so they get the same result or
+    exception as the undecorated function instead of a hashing TypeError.
+
+    Args:
+        func: Validator taking a single argument
+
+    Returns:
+        Wrapped validator exposing ``cache_info`` and ``cache_clear``
+    """
+    cached = functools.lru_cache(maxsize=_VALIDATION_CACHE_SIZE)(func)
+
+    @functools.wraps(func)
+    def wrapper(value: Any) -> _T:
+        if isinstance(value, str):
+            return cached(value)
+        return func(value)
+
+    wrapper.cache_info = cached.cache_info  # type: ignore[attr-defined]
+    wrapper.cache_clear = cached.cache_clear  # type: ignore[attr-defined]
+    return wrapper
+
+
+def _inet_pton_ok(family: int, address: str) -> bool:
+    """Check whether ``address`` parses as a literal of the given family.
+
+    Args:
+        family: ``socket.AF_INET`` or ``socket.AF_INET6``
+        address: Address string to parse
+
+    Returns:
+        True if the platform parser accepts the address, False otherwise
+    """
+    try:
+        socket.inet_pton(family, address)
+        return True
+    except (OSError, TypeError, ValueError):
+        return False
+
+
+@_cached_str_validator
 def is_valid_hostname(hostname: str) -> bool:
     """Validate hostname format.
 
@@ -32,20 +110,14 @@ def is_valid_hostname(hostname: str) -> bool:
         >>> is_valid_hostname("invalid_host!")
         False
     """
-    if not hostname or len(hostname) > 253:
+    if not isinstance(hostname, str) or not hostname or len(hostname) > 253:
         return False
 
-    # Check each label
-    labels = hostname.split(".")
-    for label in labels:
-        if not label or len(label) > 63:
-            return False
-        if not re.match(r"^[a-z0-9]([a-z0-9-]*[a-z0-9])?$", label, re.IGNORECASE):
-            return False
-
-    return True
+    # One pass over the whole name validates every label and its length
+    return _HOSTNAME_RE.fullmatch(hostname) is not None
 
 
+@_cached_str_validator
 def is_valid_ip(ip_address: str) -> bool:
     """Validate IP address format (IPv4 or IPv6).
 
@@ -60,16 +132,30 @@ def is_valid_ip(ip_address: str) -> bool:
         True
         >>> is_valid_ip("2001:db8::1")
         True
+        >>> is_valid_ip("fe80::1%eth0")
+        True
         >>> is_valid_ip("999.999.999.999")
         False
     """
-    try:
-        ipaddress.ip_address(ip_address)
-        return True
-    except ValueError:
+    if not isinstance(ip_address, str):
+        return False
+
+    # A scoped IPv6 address carries its zone (an interface name or index)
+    # after "%"; inet_pton does not take the suffix, so check it separately
+    ip_address, scoped, scope = ip_address.partition("%")
+    if scoped and (":" not in ip_address or not is_valid_interface_name(scope)):
         return False
 
+    if not _IP_CHARS_RE.fullmatch(ip_address):
+        return False
+
+    # inet_pton is a single C call; ipaddress would build a full address object.
+    # Only IPv6 literals contain a colon, so each input is parsed exactly once.
+    family = socket.AF_INET6 if ":" in ip_address else socket.AF_INET
+    return _inet_pton_ok(family, ip_address)
 
+
+@_cached_str_validator
 def is_valid_ipv4(ip_address: str) -> bool:
     """Validate IPv4 address format specifically.
 
@@ -79,13 +165,13 @@ def is_valid_ipv4(ip_address: str) -> bool:
     Returns:
         True if valid IPv4, False otherwise
     """
-    try:
-        addr = ipaddress.ip_address(ip_address)
-        return isinstance(addr, ipaddress.IPv4Address)
-    except ValueError:
+    if not isinstance(ip_address, str) or not _IPV4_SHAPE_RE.match(ip_address):
         return False
 
+    return _inet_pton_ok(socket.AF_INET, ip_address)
+
 
+@_cached_str_validator
 def is_valid_cidr(cidr: str) -> bool:
     """Validate CIDR notation.
 
@@ -108,7 +194,7 @@ def is_valid_cidr(cidr: str) -> bool:
     # CIDR notation MUST include a slash and prefix length
     if "/" not in cidr:
         return False
-    
+
     try:
         ipaddress.ip_network(cidr, strict=False)
         return True
@@ -135,6 +221,12 @@ def is_valid_port(port: int) -> bool:
         >>> is_valid_port(70000)
         False
     """
+    # Config-parsed ports are already ints; only fall back to conversion for
+    # strings and other numeric types
+    if type(port) is int:
+        return 1 <= port <= 65535
+    if port is None:
+        return False
     try:
         port_int = int(port)
         return 1 <= port_int <= 65535
@@ -142,6 +234,7 @@ def is_valid_port(port: int) -> bool:
         return False
 
 
+@_cached_str_validator
 def is_valid_mac_address(mac: str) -> bool:
     """Validate MAC address format.
 
@@ -159,16 +252,18 @@ def is_valid_mac_address(mac: str) -> bool:
         >>> is_valid_mac_address("invalid")
         False
     """
-    # Support both : and - separators
-    pattern = r"^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$"
-    return bool(re.match(pattern, mac))
+    # Support both : and - separators; reject wrong lengths before the regex
+    if not isinstance(mac, str) or len(mac) != _MAC_ADDRESS_LENGTH:
+        return False
+    return bool(_MAC_ADDRESS_RE.match(mac))
 
 
-def is_safe_path(path: str) -> bool:
+def is_safe_path(path: str, allowed_roots: Optional[Iterable[Path]] = None) -> bool:
     """Check if path is safe (no directory traversal).
 
     Args:
         path: File path to validate
+        allowed_roots: Optional directories the resolved path must stay under
 
     Returns:
         True if path is safe, False otherwise
@@ -178,35 +273,37 @@ def is_safe_path(path: str) -> bool:
         True
         >>> is_safe_path("../../etc/passwd")
         False
+        >>> is_safe_path("/etc/passwd", allowed_roots=[Path("/etc/wireguard")])
+        False
     """
     try:
-        # Check for dangerous patterns BEFORE resolving
-        # This prevents Path.resolve() from normalizing away the attack
-        dangerous_patterns = ["..", "~", "//"]
-        
-        # Check original path string for traversal attempts
-        for pattern in dangerous_patterns:
-            if pattern in path:
-                logger.warning(f"Dangerous pattern '{pattern}' detected in path: {path}")
-                return False
-        
-        # Check for absolute vs relative path manipulation
-        # Reject paths that try to escape by going relative then absolute
-        if path.startswith("..") or "/.." in path:
+        # Check the components BEFORE resolving, so Path.resolve() cannot
+        # normalize the attack away. Names like "foo..bar" are not traversal.
+        if ".." in PurePosixPath(path).parts:
             logger.warning(f"Path traversal attempt detected: {path}")
             return False
-        
-        # Additional check: ensure resolved path doesn't escape base directory
-        # if a base directory is meant to be enforced
-        # (For now, we just ensure no traversal patterns exist)
-        
-        return True
+
+        # Home-relative paths depend on whoever runs the process
+        if path.startswith("~"):
+            logger.warning(f"Home-relative path rejected: {path}")
+            return False
+
+        if allowed_roots is None:
+            return True
+
+        resolved = Path(path).resolve(strict=False)
+        if any(resolved.is_relative_to(Path(root).resolve()) for root in allowed_roots):
+            return True
+
+        logger.warning(f"Path outside allowed directories: {path}")
+        return False
 
     except Exception as e:
         logger.warning(f"Path validation error: {e}")
         return False
 
 
+@_cached_str_validator
 def is_valid_wireguard_key(key: str) -> bool:
     """Validate WireGuard key format.
 
@@ -217,30 +314,20 @@ def is_valid_wireguard_key(key: str) -> bool:
         True if valid key format, False otherwise
 
     Examples:
-        >>> is_valid_wireguard_key("cGFzc3dvcmQxMjM0NTY3ODkwMTIzNDU2Nzg5MDEyMzQ1Njc4OQ==")
+        >>> is_valid_wireguard_key("YWJjZGVmZ2hpamtsbW5vcHFyc3R1dnd4eXoxMjM0NTY=")
         True
+        >>> is_valid_wireguard_key("not-a-key")
+        False
     """
-    # WireGuard keys are 44 characters base64
-    if len(key) != 44:
+    # WireGuard keys are 32 bytes, i.e. 43 base64 characters plus one '=' pad
+    if not isinstance(key, str) or len(key) != 44 or key[43] != "=":
         return False
 
-    # Check base64 format - WireGuard uses standard base64 with padding
-    # Pattern: 42 or 43 base64 chars followed by 1 or 2 '=' for padding
-    # Total must be 44 characters
-    pattern = r"^[A-Za-z0-9+/]{42,43}=*$"
-    if not re.match(pattern, key):
-        return False
-    
-    # Verify it's valid base64 that can be decoded
-    try:
-        import base64
-        decoded = base64.b64decode(key)
-        # WireGuard keys are 32 bytes (256 bits)
-        return len(decoded) == 32
-    except Exception:
-        return False
+    # Anything left after stripping the base64 alphabet is an invalid character
+    return not key[:43].translate(_WIREGUARD_KEY_STRIP)
 
 
+@_cached_str_validator
 def sanitize_hostname(hostname: str) -> str:
     """Sanitize hostname by removing invalid characters.
 
@@ -258,7 +345,7 @@ def sanitize_hostname(hostname: str) -> str:
     hostname = hostname.lower()
 
     # Remove invalid characters
-    hostname = re.sub(r"[^a-z0-9-]", "", hostname)
+    hostname = _HOSTNAME_STRIP_RE.sub("", hostname)
 
     # Remove leading/trailing hyphens
     hostname = hostname.strip("-")
@@ -269,6 +356,7 @@ def sanitize_hostname(hostname: str) -> str:
     return hostname
 
 
+@_cached_str_validator
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename by removing dangerous characters.
 
@@ -286,7 +374,7 @@ def sanitize_filename(filename: str) -> str:
     filename = filename.replace(" ", "_")
 
     # Remove dangerous characters
-    filename = re.sub(r"[^a-zA-Z0-9._-]", "", filename)
+    filename = _FILENAME_STRIP_RE.sub("", filename)
 
     # Prevent hidden files
     if filename.startswith("."):
@@ -295,6 +383,7 @@ def sanitize_filename(filename: str) -> str:
     return filename
 
 
+@_cached_str_validator
 def validate_email(email: str) -> bool:
     """Validate email address format.
 
@@ -304,8 +393,7 @@ def validate_email(email: str) -> bool:
     Returns:
         True if valid email format, False otherwise
     """
-    pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-    return bool(re.match(pattern, email))
+    return isinstance(email, str) and _EMAIL_RE.match(email) is not None
 
 
 def is_valid_interface_name(interface: str) -> bool:
@@ -331,8 +419,7 @@ def is_valid_interface_name(interface: str) -> bool:
         return False
 
     # Only alphanumeric, underscore, hyphen, period (common in interface names)
-    pattern = r"^[a-zA-Z0-9._-]+$"
-    return bool(re.match(pattern, interface))
+    return bool(_INTERFACE_NAME_RE.match(interface))
 
 
 def is_valid_package_name(package: str) -> bool:
@@ -364,8 +451,7 @@ def is_valid_package_name(package: str) -> bool:
 
     # Debian/RPM package naming conventions
     # Must start with alphanumeric, can contain +-._
-    pattern = r"^[a-zA-Z0-9][a-zA-Z0-9+._-]*$"
-    return bool(re.match(pattern, package))
+    return bool(_PACKAGE_NAME_RE.match(package))
 
 
 def is_valid_netmask(netmask: str) -> bool:
@@ -435,7 +521,7 @@ def sanitize_interface_name(interface: str) -> str:
         "wg-0"
     """
     # Remove invalid characters (keep alphanumeric, underscore, hyphen, period)
-    interface = re.sub(r"[^a-zA-Z0-9._-]", "", interface)
+    interface = _INTERFACE_NAME_STRIP_RE.sub("", interface)
 
     # Limit length to 15 characters (IFNAMSIZ - 1)
     interface = interface[:15]
@@ -459,7 +545,7 @@ def sanitize_package_name(package: str) -> str:
         "vimmalware"
     """
     # Remove all characters except alphanumeric and +-._-
-    package = re.sub(r"[^a-zA-Z0-9+._-]", "", package)
+    package = _PACKAGE_NAME_STRIP_RE.sub("", package)
 
     # Ensure starts with alphanumeric
     if package and not package[0].isalnum():
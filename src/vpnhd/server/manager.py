@@ -1,7 +1,21 @@
 """Multi-server management system for VPNHD."""
 
 import asyncio
-from typing import Any, Dict, List, Optional
+import shlex
+from collections import deque
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 import asyncssh
 
@@ -15,6 +29,16 @@ from .models import (
 
 logger = get_logger(__name__)
 
+# Seconds allowed for TCP connect and for SSH authentication
+_SSH_CONNECT_TIMEOUT = 30
+
+# Keepalive probe interval (seconds) and unanswered probes before disconnect
+_SSH_KEEPALIVE_INTERVAL = 30
+_SSH_KEEPALIVE_COUNT_MAX = 3
+
+# Marks the boundary between sections of the combined status probe output
+_PROBE_SEPARATOR = "--vpnhd-probe--"
+
 
 class ServerManager:
     """Manage multiple VPN servers from a central location."""
@@ -32,13 +56,26 @@ class ServerManager:
         self.servers: Dict[str, ServerProfile] = {}
         self.groups: Dict[str, ServerGroup] = {}
 
-        # Operation history
-        self.operations: List[ServerOperation] = []
+        # Operation history (oldest entries are evicted once the bound is reached)
         self.max_operations_history = 1000
+        self.operations: Deque[ServerOperation] = deque(maxlen=self.max_operations_history)
 
         # SSH connection pool
         self._ssh_connections: Dict[str, asyncssh.SSHClientConnection] = {}
 
+        # Cap on concurrent SSH probes during fleet-wide checks
+        self.max_concurrent_probes = 32
+
+        # Read-only snapshot of all profiles, rebuilt whenever one is added or
+        # removed so unfiltered list_servers() calls allocate nothing
+        self._server_snapshot: Tuple[ServerProfile, ...] = ()
+
+        # Serialized profiles as last written to config, and the names whose
+        # profile may have changed since then (added, removed, updated by a
+        # probe, or handed out by get_server/list_servers)
+        self._saved_servers: Dict[str, Dict[str, Any]] = {}
+        self._dirty_servers: Set[str] = set()
+
         # Load servers from config
         self._load_servers()
 
@@ -49,24 +86,36 @@ class ServerManager:
 
             for server_name, server_data in servers_data.items():
                 try:
-                    profile = ServerProfile(**server_data)
+                    profile = ServerProfile.from_dict(server_data, trusted=True)
                     self.servers[server_name] = profile
+                    self._saved_servers[server_name] = server_data
                     self.logger.info(f"Loaded server profile: {server_name}")
                 except Exception as e:
                     self.logger.error(f"Failed to load server {server_name}: {e}")
 
+            self._server_snapshot = tuple(self.servers.values())
             self.logger.info(f"Loaded {len(self.servers)} server profiles")
 
         except Exception as e:
             self.logger.error(f"Failed to load servers: {e}")
 
     def _save_servers(self) -> None:
-        """Save server profiles to configuration."""
-        try:
-            servers_data = {name: profile.to_dict() for name, profile in self.servers.items()}
+        """Save server profiles to configuration.
 
-            self.config.set("servers", servers_data)
+        Only profiles marked dirty are re-serialized; the rest are written
+        from the copy kept since the last save.
+        """
+        try:
+            for name in self._dirty_servers:
+                profile = self.servers.get(name)
+                if profile is None:
+                    self._saved_servers.pop(name, None)
+                else:
+                    self._saved_servers[name] = profile.to_dict()
+
+            self.config.set("servers", dict(self._saved_servers))
             self.config.save()
+            self._dirty_servers.clear()
             self.logger.debug("Saved server profiles to configuration")
 
         except Exception as e:
@@ -87,6 +136,8 @@ class ServerManager:
 
         try:
             self.servers[profile.name] = profile
+            self._server_snapshot = tuple(self.servers.values())
+            self._dirty_servers.add(profile.name)
             self._save_servers()
             self.logger.info(f"Added server: {profile.name}")
             return True
@@ -95,8 +146,8 @@ class ServerManager:
             self.logger.exception(f"Failed to add server {profile.name}: {e}")
             return False
 
-    def remove_server(self, server_name: str) -> bool:
-        """Remove a server profile.
+    async def remove_server(self, server_name: str) -> bool:
+        """Remove a server profile and close its SSH connection.
 
         Args:
             server_name: Server name to remove
@@ -110,9 +161,11 @@ class ServerManager:
 
         try:
             # Close SSH connection if exists
-            asyncio.create_task(self._close_ssh_connection(server_name))
+            await self._close_ssh_connection(server_name)
 
             del self.servers[server_name]
+            self._server_snapshot = tuple(self.servers.values())
+            self._dirty_servers.add(server_name)
             self._save_servers()
             self.logger.info(f"Removed server: {server_name}")
             return True
@@ -121,6 +174,26 @@ class ServerManager:
             self.logger.exception(f"Failed to remove server {server_name}: {e}")
             return False
 
+    def remove_server_sync(self, server_name: str) -> bool:
+        """Remove a server profile from synchronous code.
+
+        Args:
+            server_name: Server name to remove
+
+        Returns:
+            bool: True if removed successfully
+
+        Raises:
+            RuntimeError: If called while an event loop is running in this
+                thread; await remove_server() there instead
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.remove_server(server_name))
+
+        raise RuntimeError("remove_server_sync() called from a running event loop")
+
     def get_server(self, server_name: str) -> Optional[ServerProfile]:
         """Get a server profile.
 
@@ -130,42 +203,80 @@ class ServerManager:
         Returns:
             Optional[ServerProfile]: Server profile or None
         """
-        return self.servers.get(server_name)
+        profile = self.servers.get(server_name)
+        if profile is not None:
+            # The caller may modify it, so write it on the next save
+            self._dirty_servers.add(server_name)
+        return profile
+
+    def mark_dirty(self, server_name: str) -> None:
+        """Mark a server profile as changed so the next save writes it.
+
+        get_server() and list_servers() already mark the profiles they
+        return; call this after modifying a profile obtained any other way.
+
+        Args:
+            server_name: Server name
+        """
+        if server_name in self.servers:
+            self._dirty_servers.add(server_name)
 
     def list_servers(
         self, enabled_only: bool = False, tags: Optional[List[str]] = None
-    ) -> List[ServerProfile]:
+    ) -> Sequence[ServerProfile]:
         """List server profiles with optional filtering.
 
+        The returned profiles are marked dirty, as the caller may modify them.
+
         Args:
             enabled_only: Only return enabled servers
             tags: Filter by tags (any match)
 
         Returns:
-            List of server profiles
+            Server profiles; without filters this is the shared snapshot tuple
         """
-        servers = list(self.servers.values())
-
-        if enabled_only:
-            servers = [s for s in servers if s.enabled]
+        servers = self._filter_servers(enabled_only, tags)
+        if servers is self._server_snapshot:
+            self._dirty_servers.update(self.servers)
+        else:
+            self._dirty_servers.update(s.name for s in servers)
+        return servers
 
-        if tags:
-            servers = [s for s in servers if any(tag in s.tags for tag in tags)]
+    def _filter_servers(
+        self, enabled_only: bool = False, tags: Optional[List[str]] = None
+    ) -> Sequence[ServerProfile]:
+        """Filter server profiles without marking them dirty; see list_servers.
 
-        return servers
+        Args:
+            enabled_only: Only return enabled servers
+            tags: Filter by tags (any match)
 
-    async def _get_ssh_connection(self, server_name: str) -> Optional[asyncssh.SSHClientConnection]:
+        Returns:
+            Server profiles; without filters this is the shared snapshot tuple
+        """
+        if not enabled_only and not tags:
+            return self._server_snapshot
+
+        # Single pass; the tag test is one C-level set operation per server
+        tagset = frozenset(tags) if tags else None
+        return [
+            s
+            for s in self._server_snapshot
+            if (not enabled_only or s.enabled) and (tagset is None or not tagset.isdisjoint(s.tags))
+        ]
+
+    async def _get_ssh_connection(
+        self, profile: ServerProfile
+    ) -> Optional[asyncssh.SSHClientConnection]:
         """Get or create SSH connection to server.
 
         Args:
-            server_name: Server name
+            profile: Server profile
 
         Returns:
             Optional[asyncssh.SSHClientConnection]: SSH connection or None
         """
-        profile = self.get_server(server_name)
-        if not profile:
-            return None
+        server_name = profile.name
 
         # Return existing connection if alive
         if server_name in self._ssh_connections:
@@ -185,6 +296,13 @@ class ServerManager:
                 "port": conn_info.port,
                 "username": conn_info.username,
                 "known_hosts": None,  # Disable host key checking for simplicity
+                # asyncssh enforces these itself; no extra wait_for task per connect
+                "connect_timeout": _SSH_CONNECT_TIMEOUT,
+                "login_timeout": _SSH_CONNECT_TIMEOUT,
+                # SSH-level keepalives close connections silently dropped by
+                # NAT/firewalls, so pooled entries report is_closed() promptly
+                "keepalive_interval": _SSH_KEEPALIVE_INTERVAL,
+                "keepalive_count_max": _SSH_KEEPALIVE_COUNT_MAX,
             }
 
             if conn_info.key_path:
@@ -196,7 +314,7 @@ class ServerManager:
                 return None
 
             self.logger.debug(f"Connecting to {server_name} via SSH...")
-            conn = await asyncio.wait_for(asyncssh.connect(**connect_params), timeout=30)
+            conn = await asyncssh.connect(**connect_params)
 
             self._ssh_connections[server_name] = conn
             self.logger.info(f"SSH connection established to {server_name}")
@@ -215,12 +333,12 @@ class ServerManager:
         Args:
             server_name: Server name
         """
-        if server_name in self._ssh_connections:
+        # Drop the pool entry first so a failed close cannot leave it behind
+        conn = self._ssh_connections.pop(server_name, None)
+        if conn is not None:
             try:
-                conn = self._ssh_connections[server_name]
                 conn.close()
                 await conn.wait_closed()
-                del self._ssh_connections[server_name]
                 self.logger.debug(f"Closed SSH connection to {server_name}")
             except Exception as e:
                 self.logger.error(f"Error closing SSH connection to {server_name}: {e}")
@@ -238,15 +356,59 @@ class ServerManager:
         Returns:
             Optional[str]: Command output or None on failure
         """
-        conn = await self._get_ssh_connection(server_name)
+        profile = self.servers.get(server_name)
+        if not profile:
+            return None
+
+        return await self._run_command(profile, command, timeout)
+
+    async def execute_command_bytes(
+        self, server_name: str, command: str, timeout: int = 30
+    ) -> Optional[bytes]:
+        """Execute command on remote server and return its raw output.
+
+        Args:
+            server_name: Server name
+            command: Command to execute
+            timeout: Command timeout in seconds
+
+        Returns:
+            Optional[bytes]: Undecoded command output or None on failure
+        """
+        profile = self.servers.get(server_name)
+        if not profile:
+            return None
+
+        return await self._run_command(profile, command, timeout, encoding=None)
+
+    async def _run_command(
+        self,
+        profile: ServerProfile,
+        command: str,
+        timeout: int = 30,
+        encoding: Optional[str] = "utf-8",
+    ) -> Optional[Union[str, bytes]]:
+        """Execute command on the server described by a profile.
+
+        Args:
+            profile: Server profile
+            command: Command to execute
+            timeout: Command timeout in seconds
+            encoding: Output encoding, or None to return bytes
+
+        Returns:
+            Optional[Union[str, bytes]]: Command output or None on failure
+        """
+        server_name = profile.name
+        conn = await self._get_ssh_connection(profile)
         if not conn:
             return None
 
         try:
-            result = await asyncio.wait_for(conn.run(command, check=True), timeout=timeout)
+            result = await conn.run(command, check=True, timeout=timeout, encoding=encoding)
             return result.stdout
 
-        except asyncio.TimeoutError:
+        except asyncssh.TimeoutError:
             self.logger.error(f"Command timeout on {server_name}: {command}")
             return None
         except Exception as e:
@@ -262,13 +424,28 @@ class ServerManager:
         Returns:
             bool: True if server is online
         """
-        profile = self.get_server(server_name)
+        profile = self.servers.get(server_name)
         if not profile:
             return False
 
+        return await self._check_status(profile)
+
+    async def _check_status(self, profile: ServerProfile) -> bool:
+        """Check status of the server described by a profile and update it.
+
+        Args:
+            profile: Server profile
+
+        Returns:
+            bool: True if server is online
+        """
+        server_name = profile.name
+        # Every outcome below updates the profile's status
+        self._dirty_servers.add(server_name)
+
         try:
             # Try to establish SSH connection
-            conn = await self._get_ssh_connection(server_name)
+            conn = await self._get_ssh_connection(profile)
 
             if not conn:
                 profile.update_status(
@@ -279,27 +456,21 @@ class ServerManager:
             # Server is reachable
             profile.update_status(online=True, error_message=None)
 
-            # Check if VPN is running
-            output = await self.execute_command(
-                server_name, f"ip link show {profile.vpn_interface}"
-            )
-            vpn_running = output is not None and "UP" in output
-
-            # Get system uptime
-            uptime_output = await self.execute_command(server_name, "cat /proc/uptime")
-            uptime = None
-            if uptime_output:
-                try:
-                    uptime = int(float(uptime_output.split()[0]))
-                except (ValueError, IndexError):
-                    # Invalid uptime format, keep as None
-                    pass
+            # Link state, uptime and WireGuard counters in a single round trip
+            probe = await self._probe_server(profile)
+            vpn_running = probe["vpn_running"]
 
             # Update status
             profile.update_status(
                 vpn_running=vpn_running,
-                uptime=uptime,
+                uptime=probe["uptime"],
             )
+            if probe["output"] is not None:
+                profile.update_metrics(
+                    active_clients=probe["active_clients"],
+                    bytes_received=probe["bytes_received"],
+                    bytes_transmitted=probe["bytes_transmitted"],
+                )
 
             self.logger.info(f"Server {server_name} status: online={True}, vpn={vpn_running}")
             return True
@@ -309,6 +480,72 @@ class ServerManager:
             profile.update_status(online=False, vpn_running=False, error_message=str(e))
             return False
 
+    async def _probe_server(self, profile: ServerProfile) -> Dict[str, Any]:
+        """Gather link state, uptime and WireGuard counters in one SSH exec.
+
+        Each ``conn.run`` opens its own SSH channel, so the individual probes
+        are joined into one remote script whose sections are separated by
+        ``_PROBE_SEPARATOR`` lines.
+
+        Args:
+            profile: Server profile
+
+        Returns:
+            Dict with the raw ``output`` (None if the command failed) and the
+            parsed ``vpn_running``, ``uptime``, ``active_clients``,
+            ``bytes_received`` and ``bytes_transmitted`` values
+        """
+        # Validated on the profile, quoted again as defence in depth
+        iface = shlex.quote(profile.vpn_interface)
+        command = f"; echo {_PROBE_SEPARATOR}; ".join(
+            [
+                # Prints one line only if the link is up; nothing if down or missing
+                f"ip -o link show dev {iface} up",
+                "cat /proc/uptime",
+                # One line per peer, so it also yields the peer count. Not
+                # "wg show dump": its first line carries the private key.
+                f"wg show {iface} transfer",
+            ]
+        )
+        # A missing interface must not fail the whole probe
+        output = await self._run_command(profile, f"{command}; true")
+
+        sections = (output or "").split(f"{_PROBE_SEPARATOR}\n")
+        sections += [""] * (3 - len(sections))
+        link_output, uptime_output, transfer_output = sections[:3]
+
+        uptime = None
+        try:
+            uptime = int(float(uptime_output.split()[0]))
+        except (ValueError, IndexError):
+            # Invalid uptime format, keep as None
+            pass
+
+        active_clients = 0
+        bytes_received = 0
+        bytes_transmitted = 0
+
+        # Parse transfer output: <public_key> <received_bytes> <transmitted_bytes>
+        for line in transfer_output.strip().split("\n"):
+            parts = line.split()
+            if len(parts) >= 3:
+                active_clients += 1
+                try:
+                    bytes_received += int(parts[1])
+                    bytes_transmitted += int(parts[2])
+                except (ValueError, IndexError):
+                    # Skip malformed lines
+                    continue
+
+        return {
+            "output": output,
+            "vpn_running": bool(link_output.strip()),
+            "uptime": uptime,
+            "active_clients": active_clients,
+            "bytes_received": bytes_received,
+            "bytes_transmitted": bytes_transmitted,
+        }
+
     async def collect_server_metrics(self, server_name: str) -> bool:
         """Collect metrics from server.
 
@@ -318,48 +555,34 @@ class ServerManager:
         Returns:
             bool: True if metrics collected successfully
         """
-        profile = self.get_server(server_name)
-        if not profile or not profile.status.online:
+        profile = self.servers.get(server_name)
+        if not profile:
             return False
 
-        try:
-            # Get WireGuard peer count
-            output = await self.execute_command(
-                server_name, f"wg show {profile.vpn_interface} peers | wc -l"
-            )
-            active_clients = 0
-            if output:
-                try:
-                    active_clients = int(output.strip())
-                except ValueError:
-                    # Invalid number format, keep default 0
-                    pass
-
-            # Get traffic statistics using wg show transfer
-            transfer_output = await self.execute_command(
-                server_name, f"wg show {profile.vpn_interface} transfer"
-            )
+        return await self._collect_metrics(profile)
+
+    async def _collect_metrics(self, profile: ServerProfile) -> bool:
+        """Collect metrics from the server described by a profile.
+
+        Args:
+            profile: Server profile
 
-            bytes_received = 0
-            bytes_transmitted = 0
-
-            if transfer_output:
-                # Parse transfer output: <public_key> <received_bytes> <transmitted_bytes>
-                for line in transfer_output.strip().split('\n'):
-                    parts = line.split()
-                    if len(parts) >= 3:
-                        try:
-                            bytes_received += int(parts[1])
-                            bytes_transmitted += int(parts[2])
-                        except (ValueError, IndexError):
-                            # Skip malformed lines
-                            continue
+        Returns:
+            bool: True if metrics collected successfully
+        """
+        server_name = profile.name
+        if not profile.status.online:
+            return False
+
+        try:
+            probe = await self._probe_server(profile)
 
             profile.update_metrics(
-                active_clients=active_clients,
-                bytes_received=bytes_received,
-                bytes_transmitted=bytes_transmitted,
+                active_clients=probe["active_clients"],
+                bytes_received=probe["bytes_received"],
+                bytes_transmitted=probe["bytes_transmitted"],
             )
+            self._dirty_servers.add(server_name)
 
             self.logger.debug(f"Collected metrics for {server_name}")
             return True
@@ -368,22 +591,46 @@ class ServerManager:
             self.logger.error(f"Error collecting metrics for {server_name}: {e}")
             return False
 
+    async def _run_bounded(
+        self,
+        servers: Sequence[ServerProfile],
+        probe: Callable[[ServerProfile], Awaitable[bool]],
+    ) -> Dict[str, bool]:
+        """Run a per-server probe concurrently, at most max_concurrent_probes at a time.
+
+        Args:
+            servers: Server profiles to probe
+            probe: Coroutine function taking a profile and returning success
+
+        Returns:
+            Dict mapping server names to probe results (False on error)
+        """
+        # Created per call: a semaphore binds to the first event loop that
+        # waits on it, and the sync wrappers start a new loop each time
+        semaphore = asyncio.Semaphore(self.max_concurrent_probes)
+
+        async def _bounded(profile: ServerProfile) -> bool:
+            async with semaphore:
+                try:
+                    return await probe(profile)
+                except Exception as e:
+                    # Keep one failing server from cancelling the whole task group
+                    self.logger.error(f"Probe failed for {profile.name}: {e}")
+                    return False
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = {s.name: tg.create_task(_bounded(s)) for s in servers}
+
+        return {name: task.result() for name, task in tasks.items()}
+
     async def check_all_servers(self) -> Dict[str, bool]:
         """Check status of all enabled servers.
 
         Returns:
             Dict mapping server names to online status
         """
-        servers = self.list_servers(enabled_only=True)
-
-        results = await asyncio.gather(
-            *[self.check_server_status(s.name) for s in servers], return_exceptions=True
-        )
-
-        return {
-            server.name: result if isinstance(result, bool) else False
-            for server, result in zip(servers, results)
-        }
+        servers = self._filter_servers(enabled_only=True)
+        return await self._run_bounded(servers, self._check_status)
 
     async def collect_all_metrics(self) -> Dict[str, bool]:
         """Collect metrics from all online servers.
@@ -391,16 +638,8 @@ class ServerManager:
         Returns:
             Dict mapping server names to collection success
         """
-        servers = [s for s in self.list_servers(enabled_only=True) if s.status.online]
-
-        results = await asyncio.gather(
-            *[self.collect_server_metrics(s.name) for s in servers], return_exceptions=True
-        )
-
-        return {
-            server.name: result if isinstance(result, bool) else False
-            for server, result in zip(servers, results)
-        }
+        servers = [s for s in self._filter_servers(enabled_only=True) if s.status.online]
+        return await self._run_bounded(servers, self._collect_metrics)
 
     def create_group(self, group: ServerGroup) -> bool:
         """Create a server group.
@@ -454,16 +693,14 @@ class ServerManager:
         Returns:
             Dict with summary information
         """
-        servers = list(self.servers.values())
-        online_count = sum(1 for s in servers if s.status.online)
-        vpn_running_count = sum(1 for s in servers if s.status.vpn_running)
-        enabled_count = sum(1 for s in servers if s.enabled)
-
+        # Counted from the profiles on every call, so changes made to a
+        # profile outside the manager are reflected too
+        servers = self._server_snapshot
         return {
             "total_servers": len(servers),
-            "enabled_servers": enabled_count,
-            "online_servers": online_count,
-            "vpn_running": vpn_running_count,
+            "enabled_servers": sum(s.enabled for s in servers),
+            "online_servers": sum(s.status.online for s in servers),
+            "vpn_running": sum(s.status.vpn_running for s in servers),
             "total_groups": len(self.groups),
             "ssh_connections": len(self._ssh_connections),
         }
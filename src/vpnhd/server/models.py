@@ -1,10 +1,29 @@
 """Data models for multi-server management."""
 
 import ipaddress
+import re
+import string
+import time
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator
+
+from ..security.validators import is_valid_interface_name
+
+# Deletion table for hostname characters: a valid hostname translates to ""
+_HOSTNAME_CHARS = str.maketrans("", "", string.ascii_letters + string.digits + ".-")
+_IPV4_CHARS = str.maketrans("", "", string.digits + ".")
+
+_SERVER_NAME_MATCH = re.compile(r"\A[A-Za-z0-9_-]+\Z").match
+_GROUP_NAME_MATCH = re.compile(r"\A[A-Za-z0-9_\- ]+\Z").match
+
+
+def _parse_datetime(value: Any) -> Any:
+    """Convert an ISO 8601 string back to a datetime, passing other values through."""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
 
 
 class ServerConnection(BaseModel):
@@ -23,15 +42,17 @@ class ServerConnection(BaseModel):
         if not v:
             raise ValueError("Host cannot be empty")
 
-        # Try to parse as IP address
-        try:
-            ipaddress.ip_address(v)
+        # Only strings shaped like an IP literal are handed to ipaddress, so
+        # ordinary hostnames never pay for a raised ValueError
+        if ":" in v or (v.count(".") == 3 and not v.translate(_IPV4_CHARS)):
+            try:
+                ipaddress.ip_address(v)
+            except ValueError:
+                raise ValueError(f"Invalid IP address: {v}")
             return v
-        except ValueError:
-            pass
 
         # Validate as hostname (basic check)
-        if not all(c.isalnum() or c in ".-" for c in v):
+        if v.translate(_HOSTNAME_CHARS):
             raise ValueError(f"Invalid hostname: {v}")
 
         return v
@@ -40,6 +61,9 @@ class ServerConnection(BaseModel):
 class ServerStatus(BaseModel):
     """Current status of a VPN server."""
 
+    # Updated in place on every status check; see _assign_fields
+    model_config = ConfigDict(validate_assignment=False)
+
     online: bool = Field(default=False, description="Server reachable via SSH")
     vpn_running: bool = Field(default=False, description="VPN service running")
     last_check: Optional[datetime] = Field(None, description="Last status check time")
@@ -54,6 +78,9 @@ class ServerStatus(BaseModel):
 class ServerMetrics(BaseModel):
     """Performance metrics for a VPN server."""
 
+    # Updated in place on every metrics collection; see _assign_fields
+    model_config = ConfigDict(validate_assignment=False)
+
     total_clients: int = Field(default=0, description="Total configured clients")
     active_clients: int = Field(default=0, description="Currently active clients")
     bytes_received: int = Field(default=0, description="Total bytes received")
@@ -64,6 +91,21 @@ class ServerMetrics(BaseModel):
     collected_at: Optional[datetime] = Field(None, description="Metrics collection time")
 
 
+# Field names accepted by ServerProfile.update_status/update_metrics
+_STATUS_FIELDS = frozenset(ServerStatus.model_fields)
+_METRICS_FIELDS = frozenset(ServerMetrics.model_fields)
+
+
+def _assign_fields(model: BaseModel, values: Dict[str, Any]) -> None:
+    """Assign known field values in one batch, bypassing BaseModel.__setattr__.
+
+    Only valid for models without validate_assignment, where __setattr__
+    would store the values unchanged anyway.
+    """
+    model.__dict__.update(values)
+    model.__pydantic_fields_set__.update(values)
+
+
 class ServerProfile(BaseModel):
     """Complete profile for a managed VPN server."""
 
@@ -112,6 +154,15 @@ class ServerProfile(BaseModel):
 
         return v
 
+    @field_validator("vpn_interface")
+    @classmethod
+    def validate_vpn_interface(cls, v: str) -> str:
+        """Validate WireGuard interface name (it is used in remote commands)."""
+        if not is_valid_interface_name(v):
+            raise ValueError(f"Invalid interface name: {v}")
+
+        return v
+
     @field_validator("name")
     @classmethod
     def validate_name(cls, v: str) -> str:
@@ -120,7 +171,7 @@ class ServerProfile(BaseModel):
             raise ValueError("Server name cannot be empty")
 
         # Only allow alphanumeric, hyphens, underscores
-        if not all(c.isalnum() or c in "-_" for c in v):
+        if not _SERVER_NAME_MATCH(v):
             raise ValueError(
                 "Server name can only contain letters, numbers, hyphens, and underscores"
             )
@@ -133,12 +184,11 @@ class ServerProfile(BaseModel):
         Args:
             **kwargs: Status fields to update
         """
-        for key, value in kwargs.items():
-            if hasattr(self.status, key):
-                setattr(self.status, key, value)
-
-        self.status.last_check = datetime.now()
-        self.updated_at = datetime.now()
+        now = datetime.now()
+        values = {key: value for key, value in kwargs.items() if key in _STATUS_FIELDS}
+        values["last_check"] = now
+        _assign_fields(self.status, values)
+        self.updated_at = now
 
     def update_metrics(self, **kwargs) -> None:
         """Update server metrics fields.
@@ -146,12 +196,11 @@ class ServerProfile(BaseModel):
         Args:
             **kwargs: Metric fields to update
         """
-        for key, value in kwargs.items():
-            if hasattr(self.metrics, key):
-                setattr(self.metrics, key, value)
-
-        self.metrics.collected_at = datetime.now()
-        self.updated_at = datetime.now()
+        now = datetime.now()
+        values = {key: value for key, value in kwargs.items() if key in _METRICS_FIELDS}
+        values["collected_at"] = now
+        _assign_fields(self.metrics, values)
+        self.updated_at = now
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary.
@@ -162,16 +211,49 @@ class ServerProfile(BaseModel):
         return self.model_dump()
 
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> "ServerProfile":
+    def from_dict(cls, data: Dict[str, Any], *, trusted: bool = False) -> "ServerProfile":
         """Create from dictionary.
 
+        Trusted data (profiles previously serialized by ``to_dict``) is loaded
+        with ``model_construct``, skipping field validation; only datetime
+        strings are converted back and ``vpn_interface``, which reaches remote
+        shell commands, is still checked. Anything user-supplied must use the
+        default validated path.
+
         Args:
             data: Dictionary data
+            trusted: Whether the data was produced by ``to_dict``
 
         Returns:
             ServerProfile instance
+
+        Raises:
+            ValueError: If trusted data carries an invalid interface name
         """
-        return cls(**data)
+        if not trusted:
+            return cls.model_validate(data)
+
+        values = dict(data)
+        if "vpn_interface" in values:
+            # A hand-edited or older servers file may still hold anything here
+            cls.validate_vpn_interface(values["vpn_interface"])
+        values["connection"] = ServerConnection.model_construct(**values["connection"])
+
+        status = dict(values.get("status") or {})
+        if "last_check" in status:
+            status["last_check"] = _parse_datetime(status["last_check"])
+        values["status"] = ServerStatus.model_construct(**status)
+
+        metrics = dict(values.get("metrics") or {})
+        if "collected_at" in metrics:
+            metrics["collected_at"] = _parse_datetime(metrics["collected_at"])
+        values["metrics"] = ServerMetrics.model_construct(**metrics)
+
+        for key in ("created_at", "updated_at"):
+            if key in values:
+                values[key] = _parse_datetime(values[key])
+
+        return cls.model_construct(**values)
 
 
 class ServerGroup(BaseModel):
@@ -192,7 +274,7 @@ class ServerGroup(BaseModel):
         if not v:
             raise ValueError("Group name cannot be empty")
 
-        if not all(c.isalnum() or c in "-_ " for c in v):
+        if not _GROUP_NAME_MATCH(v):
             raise ValueError(
                 "Group name can only contain letters, numbers, hyphens, " "underscores, and spaces"
             )
@@ -214,6 +296,15 @@ class ServerOperation(BaseModel):
     completed_at: Optional[datetime] = Field(None, description="Operation completion time")
     duration: Optional[float] = Field(None, description="Operation duration in seconds")
 
+    # Monotonic clock reading at creation, used to time the operation; None
+    # when started_at was supplied (e.g. a record loaded from storage)
+    _started_monotonic: Optional[float] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        """Start the monotonic clock for operations created just now."""
+        if "started_at" not in self.model_fields_set:
+            self._started_monotonic = time.monotonic()
+
     def complete(self, status: str, message: Optional[str] = None) -> None:
         """Mark operation as complete.
 
@@ -226,7 +317,9 @@ class ServerOperation(BaseModel):
             self.message = message
 
         self.completed_at = datetime.now()
-        if self.started_at:
+        if self._started_monotonic is not None:
+            self.duration = time.monotonic() - self._started_monotonic
+        else:
             self.duration = (self.completed_at - self.started_at).total_seconds()
 
 
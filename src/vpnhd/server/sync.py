@@ -2,15 +2,81 @@
 
 import asyncio
 import hashlib
+import json
+import shlex
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+import yaml
 
 from ..utils.logging import get_logger
 from .manager import ServerManager
 from .models import SyncConfiguration
 
+# Prefer the libyaml-backed loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeDumper as _SafeDumper
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeDumper as _SafeDumper  # type: ignore[assignment]
+    from yaml import SafeLoader as _SafeLoader  # type: ignore[assignment]
+
 logger = get_logger(__name__)
 
+# Heredoc terminator for pushed configs; lengthened if the content contains it
+_CONFIG_HEREDOC_EOF = "VPNHD_CONFIG_EOF"
+
+
+def _string_keys(data: Any) -> Any:
+    """Recursively convert mapping keys to strings.
+
+    Args:
+        data: Parsed configuration data
+
+    Returns:
+        Any: The same data with every mapping key passed through str()
+    """
+    if isinstance(data, dict):
+        return {str(key): _string_keys(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_string_keys(item) for item in data]
+    return data
+
+
+def _canonical_json(data: Any) -> bytes:
+    """Serialize data to a canonical (sorted-key, compact) JSON byte string.
+
+    YAML allows mappings whose keys mix types (e.g. ``{1: a, "x": b}``),
+    which json cannot sort; those are retried with every key as a string.
+
+    Args:
+        data: Parsed configuration data
+
+    Returns:
+        bytes: Canonical JSON encoding, suitable for hashing
+    """
+    try:
+        return json.dumps(data, sort_keys=True, separators=(",", ":"), default=str).encode()
+    except TypeError:
+        return json.dumps(
+            _string_keys(data), sort_keys=True, separators=(",", ":"), default=str
+        ).encode()
+
+
+def _config_hash(config_data: Any) -> str:
+    """Hash a parsed configuration.
+
+    The hash covers the canonical JSON form, so servers with the same
+    settings hash equally regardless of YAML formatting or key order.
+
+    Args:
+        config_data: Parsed configuration data
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    return hashlib.sha256(_canonical_json(config_data)).hexdigest()
+
 
 class ConfigSync:
     """Synchronize configurations across multiple VPN servers."""
@@ -33,6 +99,9 @@ class ConfigSync:
         self._task: Optional[asyncio.Task] = None
         self._last_sync: Optional[datetime] = None
 
+        # Bound on concurrent per-target sync operations
+        self.max_concurrent_syncs = 16
+
     async def get_server_config_hash(self, server_name: str) -> Optional[str]:
         """Get hash of server's configuration.
 
@@ -40,20 +109,19 @@ class ConfigSync:
             server_name: Server name
 
         Returns:
-            Optional[str]: Configuration hash or None
+            Optional[str]: Configuration hash (as in detect_config_conflicts) or None
         """
         try:
-            # Get configuration file from server
-            config_content = await self.server_manager.execute_command(
+            # Get configuration file from server as raw bytes; the YAML
+            # loader takes bytes, so no decode step is needed
+            config_content = await self.server_manager.execute_command_bytes(
                 server_name, "cat ~/.config/vpnhd/config.yaml 2>/dev/null || echo '{}'"
             )
 
             if not config_content:
                 return None
 
-            # Calculate hash
-            config_hash = hashlib.sha256(config_content.encode()).hexdigest()
-            return config_hash
+            return _config_hash(yaml.load(config_content, Loader=_SafeLoader))
 
         except Exception as e:
             self.logger.error(f"Failed to get config hash for {server_name}: {e}")
@@ -77,12 +145,7 @@ class ConfigSync:
             if not config_content:
                 return None
 
-            # Parse YAML (simplified - would need actual YAML parser)
-            # For now, assume JSON format or convert
-            import yaml
-
-            config_data = yaml.safe_load(config_content)
-            return config_data
+            return yaml.load(config_content, Loader=_SafeLoader)
 
         except Exception as e:
             self.logger.error(f"Failed to get config from {server_name}: {e}")
@@ -100,25 +163,29 @@ class ConfigSync:
         """
         try:
             # Convert config to YAML
-            import yaml
-
-            config_yaml = yaml.safe_dump(config_data, default_flow_style=False)
+            config_yaml = yaml.dump(config_data, Dumper=_SafeDumper, default_flow_style=False)
 
             # Create temp file and upload
-            temp_path = f"/tmp/vpnhd_config_{datetime.now().timestamp()}.yaml"
-
-            # Write config via SSH (multi-step process)
-            commands = [
-                "mkdir -p ~/.config/vpnhd",
-                f"cat > {temp_path} << 'VPNHD_CONFIG_EOF'\n{config_yaml}\nVPNHD_CONFIG_EOF",
-                f"mv {temp_path} ~/.config/vpnhd/config.yaml",
-            ]
-
-            for cmd in commands:
-                result = await self.server_manager.execute_command(server_name, cmd)
-                if result is None:
-                    self.logger.error(f"Failed to push config to {server_name}")
-                    return False
+            temp_path = shlex.quote(f"/tmp/vpnhd_config_{datetime.now().timestamp()}.yaml")
+
+            # A line equal to the terminator would end the heredoc early
+            terminator = _CONFIG_HEREDOC_EOF
+            while terminator in config_yaml:
+                terminator += "_"
+
+            # Write config via SSH in a single round trip; the heredoc body
+            # follows the command line, so mv only runs once it is written
+            command = (
+                "mkdir -p ~/.config/vpnhd && "
+                f"cat > {temp_path} << '{terminator}' && "
+                f"mv {temp_path} ~/.config/vpnhd/config.yaml\n"
+                f"{config_yaml}\n{terminator}"
+            )
+
+            result = await self.server_manager.execute_command(server_name, command)
+            if result is None:
+                self.logger.error(f"Failed to push config to {server_name}")
+                return False
 
             self.logger.info(f"Successfully pushed config to {server_name}")
             return True
@@ -156,28 +223,24 @@ class ConfigSync:
                 self.logger.warning(f"No clients found in {source_server}")
                 return {server: False for server in target_servers}
 
-            # Sync to each target
-            results = {}
-            for target in target_servers:
-                if target in self.sync_config.excluded_servers:
-                    self.logger.info(f"Skipping excluded server: {target}")
-                    results[target] = False
-                    continue
-
+            async def _sync_one(target: str) -> bool:
                 # Get target config
                 target_config = await self.get_server_config(target)
                 if not target_config:
-                    results[target] = False
-                    continue
+                    return False
+
+                # Nothing to push if the target already has these clients
+                if target_config.get("clients") == clients:
+                    self.logger.debug(f"Clients already in sync on {target}")
+                    return True
 
                 # Merge client configs
                 target_config["clients"] = clients
 
                 # Push updated config
-                success = await self.push_config_to_server(target, target_config)
-                results[target] = success
+                return await self.push_config_to_server(target, target_config)
 
-            return results
+            return await self._sync_targets(target_servers, _sync_one)
 
         except Exception as e:
             self.logger.exception(f"Error syncing client configs: {e}")
@@ -222,32 +285,74 @@ class ConfigSync:
                     if k not in ["clients", "servers"]  # Exclude client/server lists
                 }
 
-            # Sync to each target
-            results = {}
-            for target in target_servers:
-                if target in self.sync_config.excluded_servers:
-                    results[target] = False
-                    continue
-
+            async def _sync_one(target: str) -> bool:
                 # Get target config
                 target_config = await self.get_server_config(target)
                 if not target_config:
-                    results[target] = False
-                    continue
+                    return False
+
+                # Nothing to push if the target already has these settings
+                if all(
+                    key in target_config and target_config[key] == value
+                    for key, value in settings.items()
+                ):
+                    self.logger.debug(f"Settings already in sync on {target}")
+                    return True
 
                 # Merge settings
                 target_config.update(settings)
 
                 # Push updated config
-                success = await self.push_config_to_server(target, target_config)
-                results[target] = success
+                return await self.push_config_to_server(target, target_config)
 
-            return results
+            return await self._sync_targets(target_servers, _sync_one)
 
         except Exception as e:
             self.logger.exception(f"Error syncing server settings: {e}")
             return {server: False for server in target_servers}
 
+    async def _sync_targets(
+        self, target_servers: List[str], sync_one: Callable[[str], Awaitable[bool]]
+    ) -> Dict[str, bool]:
+        """Run a per-target sync operation on all targets concurrently.
+
+        Excluded servers are skipped, and at most ``max_concurrent_syncs``
+        operations run at once. An operation that raises counts as failed.
+
+        Args:
+            target_servers: List of target server names
+            sync_one: Coroutine function syncing a single target
+
+        Returns:
+            Dict mapping server names to sync success
+        """
+        excluded = frozenset(self.sync_config.excluded_servers)
+
+        # Created per call: a semaphore binds to the first event loop that
+        # waits on it, and callers may run each sync in a new loop
+        semaphore = asyncio.Semaphore(self.max_concurrent_syncs)
+
+        async def _bounded(target: str) -> bool:
+            if target in excluded:
+                self.logger.info(f"Skipping excluded server: {target}")
+                return False
+
+            async with semaphore:
+                return await sync_one(target)
+
+        results = await asyncio.gather(
+            *(_bounded(target) for target in target_servers), return_exceptions=True
+        )
+
+        sync_results = {}
+        for target, result in zip(target_servers, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Sync to {target} failed: {result}")
+                result = False
+            sync_results[target] = result
+
+        return sync_results
+
     async def detect_config_conflicts(self, server_names: List[str]) -> Dict[str, Any]:
         """Detect configuration conflicts between servers.
 
@@ -258,17 +363,21 @@ class ConfigSync:
             Dict with conflict information
         """
         try:
-            # Get configs from all servers
+            semaphore = asyncio.Semaphore(self.max_concurrent_syncs)
+
+            async def _fetch(server: str) -> Optional[Dict[str, Any]]:
+                async with semaphore:
+                    return await self.get_server_config(server)
+
+            # Get configs from all servers concurrently, reading each only once
             configs = {}
             hashes = {}
 
-            for server in server_names:
-                config = await self.get_server_config(server)
+            fetched = await asyncio.gather(*(_fetch(server) for server in server_names))
+            for server, config in zip(server_names, fetched):
                 if config:
                     configs[server] = config
-                    config_hash = await self.get_server_config_hash(server)
-                    if config_hash:
-                        hashes[server] = config_hash
+                    hashes[server] = _config_hash(config)
 
             # Find differences
             conflicts = []
@@ -315,49 +424,63 @@ class ConfigSync:
         Returns:
             List of differences
         """
-        diffs = []
+        return list(self._iter_config_differences(config1, config2, path))
 
-        # Check keys in config1
-        for key in config1:
-            current_path = f"{path}.{key}" if path else key
+    def _iter_config_differences(
+        self, config1: Dict[str, Any], config2: Dict[str, Any], path: str = ""
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield differences between two configurations as they are found.
+
+        Nested sections are walked with an explicit stack; sections that
+        compare equal are skipped without being descended into. Callers that
+        only need to know whether configs differ can stop at the first item.
+
+        Args:
+            config1: First configuration
+            config2: Second configuration
+            path: Current path in config tree
+
+        Yields:
+            Difference records
+        """
+        stack = [(config1, config2, path)]
 
-            if key not in config2:
-                diffs.append(
-                    {
-                        "path": current_path,
+        while stack:
+            section1, section2, section_path = stack.pop()
+            prefix = f"{section_path}." if section_path else ""
+
+            # Check keys in the first section
+            for key, value1 in section1.items():
+                if key not in section2:
+                    yield {
+                        "path": f"{prefix}{key}",
                         "type": "missing_in_second",
-                        "value1": config1[key],
+                        "value1": value1,
                     }
-                )
-            elif isinstance(config1[key], dict) and isinstance(config2[key], dict):
-                # Recursive comparison
-                nested_diffs = self._find_config_differences(
-                    config1[key], config2[key], current_path
-                )
-                diffs.extend(nested_diffs)
-            elif config1[key] != config2[key]:
-                diffs.append(
-                    {
-                        "path": current_path,
+                    continue
+
+                value2 = section2[key]
+                if value1 is value2 or value1 == value2:
+                    continue
+
+                if isinstance(value1, dict) and isinstance(value2, dict):
+                    stack.append((value1, value2, f"{prefix}{key}"))
+                else:
+                    yield {
+                        "path": f"{prefix}{key}",
                         "type": "value_mismatch",
-                        "value1": config1[key],
-                        "value2": config2[key],
+                        "value1": value1,
+                        "value2": value2,
                     }
-                )
-
-        # Check for keys only in config2
-        for key in config2:
-            if key not in config1:
-                current_path = f"{path}.{key}" if path else key
-                diffs.append(
-                    {
-                        "path": current_path,
+
+            # Check for keys only in the second section
+            for key, value2 in section2.items():
+                if key not in section1:
+                    yield {
+                        "path": f"{prefix}{key}",
                         "type": "missing_in_first",
-                        "value2": config2[key],
+                        "value2": value2,
                     }
-                )
-
-        return diffs
 
     async def auto_sync(self, primary_server: str) -> Dict[str, Any]:
         """Automatically sync from primary server to all others.
@@ -371,11 +494,8 @@ class ConfigSync:
         try:
             # Get all enabled servers except primary
             all_servers = self.server_manager.list_servers(enabled_only=True)
-            target_servers = [
-                s.name
-                for s in all_servers
-                if s.name != primary_server and s.name not in self.sync_config.excluded_servers
-            ]
+            skipped = frozenset((primary_server, *self.sync_config.excluded_servers))
+            target_servers = [s.name for s in all_servers if s.name not in skipped]
 
             if not target_servers:
                 self.logger.info("No target servers for sync")
@@ -1,11 +1,32 @@
-"""System utilities module for VPNHD."""
+"""System utilities module for VPNHD.
 
-from .commands import CommandResult, check_command_exists, execute_command, execute_commands
-from .fail2ban_config import Fail2banConfigManager
-from .files import FileManager
-from .packages import PackageManager
-from .services import ServiceManager
-from .ssh_config import SSHConfigManager
+Submodules are imported on first attribute access (PEP 562), so importing
+``vpnhd.system`` does not pull in every manager up front.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .commands import CommandResult, check_command_exists, execute_command, execute_commands
+    from .fail2ban_config import Fail2banConfigManager
+    from .files import FileManager
+    from .packages import PackageManager
+    from .services import ServiceManager
+    from .ssh_config import SSHConfigManager
+
+# Public name -> submodule that defines it
+_LAZY_IMPORTS = {
+    "execute_command": "commands",
+    "execute_commands": "commands",
+    "check_command_exists": "commands",
+    "CommandResult": "commands",
+    "PackageManager": "packages",
+    "ServiceManager": "services",
+    "FileManager": "files",
+    "SSHConfigManager": "ssh_config",
+    "Fail2banConfigManager": "fail2ban_config",
+}
 
 __all__ = [
     "execute_command",
@@ -18,3 +39,20 @@ __all__ = [
     "SSHConfigManager",
     "Fail2banConfigManager",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import a public name from its submodule on first access."""
+    try:
+        module_name = _LAZY_IMPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    """Include lazily imported names in ``dir()``."""
+    return sorted(set(globals()) | set(__all__))
@@ -1,15 +1,23 @@
 """Safe command execution utilities for VPNHD."""
 
 import asyncio
+import atexit
+import functools
 import shlex
+import shutil
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 from ..utils.constants import COMMAND_TIMEOUT_DEFAULT
 from ..utils.logging import get_logger
 
+logger = get_logger("commands")
+
 # Sensitive parameter patterns that should be redacted in logs
 SENSITIVE_PARAMS = {
     "-p",
@@ -25,6 +33,36 @@ SENSITIVE_PARAMS = {
     "--private-key",
 }
 
+# SENSITIVE_PARAMS as a tuple, so str.startswith can test every prefix in C
+_SENSITIVE_PREFIXES = tuple(sorted(SENSITIVE_PARAMS))
+
+# stdin payloads larger than this (in characters) are sent as bytes
+LARGE_INPUT_THRESHOLD = 64 * 1024
+
+# Shared worker pool for concurrent command execution, created on first use
+_EXEC_POOL: Optional[ThreadPoolExecutor] = None
+_EXEC_POOL_LOCK = threading.Lock()
+
+
+def _get_exec_pool() -> ThreadPoolExecutor:
+    """
+    Get the shared command execution thread pool, creating it if needed.
+
+    Returns:
+        ThreadPoolExecutor: Pool shared by all concurrent command dispatch
+    """
+    global _EXEC_POOL
+
+    if _EXEC_POOL is None:
+        with _EXEC_POOL_LOCK:
+            if _EXEC_POOL is None:
+                # Workers mostly wait on child processes, so the pool uses the
+                # I/O-oriented default size (cpu_count + 4, capped at 32)
+                _EXEC_POOL = ThreadPoolExecutor(thread_name_prefix="vpnhd-cmd")
+                atexit.register(_EXEC_POOL.shutdown, wait=False)
+
+    return _EXEC_POOL
+
 
 def _has_sensitive_params(command_list: List[str]) -> bool:
     """
@@ -36,10 +74,52 @@ def _has_sensitive_params(command_list: List[str]) -> bool:
     Returns:
         True if command contains sensitive parameters
     """
-    for arg in command_list:
-        if any(arg.lower().startswith(param) for param in SENSITIVE_PARAMS):
-            return True
-    return False
+    # Every sensitive parameter is a flag, so non-flag arguments are skipped early
+    return any(
+        arg[:1] == "-" and arg.lower().startswith(_SENSITIVE_PREFIXES) for arg in command_list
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _resolve_executable(name: str) -> Optional[str]:
+    """
+    Resolve a command name to its full path in PATH.
+
+    Args:
+        name: Command name
+
+    Returns:
+        Optional[str]: Absolute path of the executable, or None if not found
+    """
+    return shutil.which(name)
+
+
+def _spawn_options(
+    command_list: List[str], cwd: Optional[Path], env: Optional[dict], fast_spawn: bool
+) -> dict:
+    """
+    Build extra subprocess options for the posix_spawn fast path.
+
+    CPython only uses posix_spawn when close_fds is False, no cwd is set and
+    the executable is given as a path, so the command is resolved first.
+
+    Args:
+        command_list: Command as list of strings
+        cwd: Working directory
+        env: Environment variables
+        fast_spawn: Whether the caller requested the fast path
+
+    Returns:
+        dict: Keyword arguments for subprocess.run (empty if not applicable)
+    """
+    if not fast_spawn or cwd is not None or env is not None or not command_list:
+        return {}
+
+    executable = _resolve_executable(command_list[0])
+    if executable is None:
+        return {}
+
+    return {"executable": executable, "close_fds": False}
 
 
 @dataclass
@@ -51,6 +131,7 @@ class CommandResult:
     stderr: str
     success: bool
     command: str
+    stdout_bytes: Optional[bytes] = None  # Raw stdout when run with text=False
 
     def __bool__(self) -> bool:
         """Allow boolean evaluation of result."""
@@ -60,11 +141,13 @@ class CommandResult:
 def execute_command(
     command: Union[str, List[str]],
     sudo: bool = False,
-    check: bool = True,
+    check: bool = False,
     capture_output: bool = True,
     timeout: Optional[int] = None,
     cwd: Optional[Path] = None,
     env: Optional[dict] = None,
+    fast_spawn: bool = False,
+    text: bool = True,
 ) -> CommandResult:
     """
     Execute command safely without shell injection vulnerabilities.
@@ -77,6 +160,11 @@ def execute_command(
         timeout: Command timeout in seconds
         cwd: Working directory
         env: Environment variables
+        fast_spawn: Spawn via posix_spawn (close_fds=False) for internal
+            polling commands; only for trusted commands, as inheritable
+            file descriptors are passed to the child
+        text: Decode stdout; if False, the raw output is in
+            CommandResult.stdout_bytes and stdout is empty
 
     Returns:
         CommandResult: Execution result
@@ -86,26 +174,71 @@ def execute_command(
         to prevent command injection attacks. Commands are never executed
         through a shell unless absolutely necessary.
     """
-    logger = get_logger("commands")
-
     # Parse command if string
     if isinstance(command, str):
         command_list = shlex.split(command)
     else:
         command_list = list(command)
 
+    return _execute_command_list(
+        command_list,
+        sudo=sudo,
+        check=check,
+        capture_output=capture_output,
+        timeout=timeout,
+        cwd=cwd,
+        env=env,
+        fast_spawn=fast_spawn,
+        text=text,
+    )
+
+
+def _execute_command_list(
+    command_list: List[str],
+    sudo: bool = False,
+    check: bool = False,
+    capture_output: bool = True,
+    timeout: Optional[int] = None,
+    cwd: Optional[Path] = None,
+    env: Optional[dict] = None,
+    fast_spawn: bool = False,
+    text: bool = True,
+) -> CommandResult:
+    """
+    Execute an already tokenized command; see execute_command.
+
+    Internal callers that build argument lists themselves call this directly
+    to skip the string check. command_list is never modified.
+
+    Args:
+        command_list: Command as list of arguments
+        sudo: Whether to use sudo
+        check: Raise exception on non-zero exit
+        capture_output: Capture stdout/stderr
+        timeout: Command timeout in seconds
+        cwd: Working directory
+        env: Environment variables
+        fast_spawn: Spawn via posix_spawn (close_fds=False); trusted commands only
+        text: Decode stdout; if False, the raw output is in stdout_bytes
+
+    Returns:
+        CommandResult: Execution result
+    """
     # Prepend sudo if requested
     if sudo:
         command_list = ["sudo"] + command_list
 
+    # Scan once; the result decides what every log line below may include
+    sensitive = _has_sensitive_params(command_list)
+
     # Use default timeout if not specified
     if timeout is None:
         timeout = COMMAND_TIMEOUT_DEFAULT
 
     # Log command for debugging (only if it doesn't contain sensitive parameters)
     command_str = " ".join(command_list)
-    if not _has_sensitive_params(command_list):
-        logger.debug(f"Executing command: {command_str}")
+    if not sensitive:
+        logger.debug("Executing command: %s", command_str)
     else:
         logger.debug("Executing command with sensitive parameters (not logged for security)")
 
@@ -115,25 +248,34 @@ def execute_command(
             command_list,
             shell=False,  # SECURITY: Prevents command injection
             capture_output=capture_output,
-            text=True,
+            text=text,
             timeout=timeout,
             cwd=cwd,
             env=env,
             check=False,  # We handle errors manually
+            **_spawn_options(command_list, cwd, env, fast_spawn),
         )
 
         success = result.returncode == 0
 
+        stdout = result.stdout if capture_output else ""
+        stderr = result.stderr if capture_output else ""
+        stdout_bytes = None
+        if not text:
+            # Only stdout is wanted raw; stderr is always logged as text
+            stdout_bytes, stdout = stdout or b"", ""
+            stderr = stderr.decode(errors="replace") if stderr else ""
+
         if not success:
-            if not _has_sensitive_params(command_list):
+            if not sensitive:
                 logger.warning(f"Command failed with exit code {result.returncode}: {command_str}")
             else:
                 logger.warning(
                     f"Command with sensitive parameters failed with "
                     f"exit code {result.returncode}"
                 )
-            if result.stderr:
-                logger.warning(f"  stderr: {result.stderr.strip()}")
+            if stderr:
+                logger.warning(f"  stderr: {stderr.strip()}")
 
         if check and not success:
             raise subprocess.CalledProcessError(
@@ -142,14 +284,15 @@ def execute_command(
 
         return CommandResult(
             exit_code=result.returncode,
-            stdout=result.stdout if capture_output else "",
-            stderr=result.stderr if capture_output else "",
+            stdout=stdout,
+            stderr=stderr,
             success=success,
             command=command_str,
+            stdout_bytes=stdout_bytes,
         )
 
     except subprocess.TimeoutExpired as e:
-        if not _has_sensitive_params(command_list):
+        if not sensitive:
             logger.error(f"Command timed out after {timeout}s: {command_str}")
         else:
             logger.error(f"Command with sensitive parameters timed out after {timeout}s")
@@ -161,6 +304,9 @@ def execute_command(
             command=command_str,
         )
 
+    except subprocess.CalledProcessError:
+        raise  # Requested by check=True; not an execution error
+
     except Exception as e:
         logger.error(f"Error executing command: {e}")
         return CommandResult(
@@ -173,6 +319,7 @@ def execute_commands(
     sudo: bool = False,
     stop_on_error: bool = True,
     timeout: Optional[int] = None,
+    parallel: bool = False,
 ) -> List[CommandResult]:
     """
     Execute multiple commands in sequence.
@@ -182,11 +329,15 @@ def execute_commands(
         sudo: Whether to use sudo
         stop_on_error: Stop on first error
         timeout: Command timeout in seconds
+        parallel: Run independent commands concurrently on the shared worker
+            pool; only honoured when stop_on_error is False
 
     Returns:
-        List[CommandResult]: Results for each command
+        List[CommandResult]: Results for each command, in input order
     """
-    logger = get_logger("commands")
+    if parallel and not stop_on_error and len(commands) > 1:
+        return execute_command_pool(commands, sudo=sudo, timeout=timeout)
+
     results = []
 
     for command in commands:
@@ -201,18 +352,55 @@ def execute_commands(
     return results
 
 
+def execute_command_pool(
+    commands: List[Union[str, List[str]]],
+    sudo: bool = False,
+    timeout: Optional[int] = None,
+) -> List[CommandResult]:
+    """
+    Execute independent commands concurrently on the shared worker pool.
+
+    subprocess.run releases the GIL while waiting, so the commands' run
+    times overlap. Failures never raise; inspect each result instead.
+
+    Args:
+        commands: List of commands (strings or argument lists)
+        sudo: Whether to use sudo
+        timeout: Per-command timeout in seconds
+
+    Returns:
+        List[CommandResult]: Results for each command, in input order
+    """
+    return list(
+        _get_exec_pool().map(
+            lambda command: execute_command(command, sudo=sudo, check=False, timeout=timeout),
+            commands,
+        )
+    )
+
+
+@functools.lru_cache(maxsize=256)
 def check_command_exists(command: str) -> bool:
     """
     Check if command exists in PATH.
 
+    The PATH is searched in-process (no subprocess is spawned) and results
+    are cached; call ``clear_command_cache()`` after changing PATH or
+    installing new commands.
+
     Args:
         command: Command name
 
     Returns:
         bool: True if command exists
     """
-    result = execute_command(f"command -v {shlex.quote(command)}", check=False, capture_output=True)
-    return result.success
+    return shutil.which(command) is not None
+
+
+def clear_command_cache() -> None:
+    """Drop cached PATH lookups so newly installed commands are found."""
+    check_command_exists.cache_clear()
+    _resolve_executable.cache_clear()
 
 
 def run_command_with_input(
@@ -238,8 +426,6 @@ def run_command_with_input(
     Security:
         Uses array-based command execution to prevent injection attacks.
     """
-    logger = get_logger("commands")
-
     # Parse command if string
     if isinstance(command, str):
         command_list = shlex.split(command)
@@ -254,25 +440,35 @@ def run_command_with_input(
         timeout = COMMAND_TIMEOUT_DEFAULT
 
     command_str = " ".join(command_list)
-    logger.debug(f"Executing command with input: {command_str}")
+    logger.debug("Executing command with input: %s", command_str)
+
+    # Large payloads are encoded once and written as bytes, bypassing the
+    # text-mode stdin wrapper; output is decoded afterwards
+    binary_input = len(input_data) > LARGE_INPUT_THRESHOLD
 
     try:
         result = subprocess.run(
             command_list,
             shell=False,  # SECURITY: Prevents command injection
-            input=input_data,
+            input=input_data.encode() if binary_input else input_data,
             capture_output=capture_output,
-            text=True,
+            text=not binary_input,
             timeout=timeout,
             check=False,
         )
 
         success = result.returncode == 0
 
+        stdout = result.stdout if capture_output else ""
+        stderr = result.stderr if capture_output else ""
+        if binary_input and capture_output:
+            stdout = stdout.decode() if stdout else ""
+            stderr = stderr.decode() if stderr else ""
+
         return CommandResult(
             exit_code=result.returncode,
-            stdout=result.stdout if capture_output else "",
-            stderr=result.stderr if capture_output else "",
+            stdout=stdout,
+            stderr=stderr,
             success=success,
             command=command_str,
         )
@@ -324,10 +520,18 @@ def command_exists_any(commands: List[str]) -> bool:
     return any(check_command_exists(cmd) for cmd in commands)
 
 
+# Cached get_command_version results: (command, flag) -> (monotonic time, version)
+_VERSION_CACHE_TTL = 300
+_version_cache: Dict[Tuple[str, str], Tuple[float, Optional[str]]] = {}
+
+
 def get_command_version(command: str, version_flag: str = "--version") -> Optional[str]:
     """
     Get version of a command.
 
+    Results are cached for five minutes; call
+    ``clear_command_version_cache()`` to drop them early.
+
     Args:
         command: Command name
         version_flag: Flag to get version (default: --version)
@@ -335,23 +539,35 @@ def get_command_version(command: str, version_flag: str = "--version") -> Option
     Returns:
         Optional[str]: Version string or None if failed
     """
-    if not check_command_exists(command):
-        return None
+    key = (command, version_flag)
+    now = time.monotonic()
+    cached = _version_cache.get(key)
+    if cached is not None and now - cached[0] < _VERSION_CACHE_TTL:
+        return cached[1]
 
-    result = execute_command([command, version_flag], check=False)
-    if result.success:
-        return result.stdout.strip().split("\n")[0]
+    version = None
+    if check_command_exists(command):
+        result = _execute_command_list([command, version_flag], check=False)
+        if result.success:
+            version = result.stdout.strip().split("\n")[0]
 
-    return None
+    _version_cache[key] = (now, version)
+    return version
+
+
+def clear_command_version_cache() -> None:
+    """Drop all cached get_command_version results."""
+    _version_cache.clear()
 
 
 async def execute_command_async(
     command: Union[str, List[str]],
     sudo: bool = False,
-    check: bool = True,
+    check: bool = False,
     timeout: Optional[int] = None,
     cwd: Optional[Path] = None,
     env: Optional[dict] = None,
+    fast_spawn: bool = False,
 ) -> CommandResult:
     """
     Execute command asynchronously without shell injection vulnerabilities.
@@ -363,6 +579,9 @@ async def execute_command_async(
         timeout: Command timeout in seconds
         cwd: Working directory
         env: Environment variables
+        fast_spawn: Spawn via posix_spawn (close_fds=False) for internal
+            polling commands; only for trusted commands, as inheritable
+            file descriptors are passed to the child
 
     Returns:
         CommandResult: Execution result
@@ -372,8 +591,6 @@ async def execute_command_async(
         command injection attacks. Commands are never executed through
         a shell.
     """
-    logger = get_logger("commands")
-
     # Parse command if string
     if isinstance(command, str):
         command_list = shlex.split(command)
@@ -384,34 +601,41 @@ async def execute_command_async(
     if sudo:
         command_list = ["sudo"] + command_list
 
+    # Scan once; the result decides what every log line below may include
+    sensitive = _has_sensitive_params(command_list)
+
     # Use default timeout if not specified
     if timeout is None:
         timeout = COMMAND_TIMEOUT_DEFAULT
 
     # Log command for debugging (only if it doesn't contain sensitive parameters)
     command_str = " ".join(command_list)
-    if not _has_sensitive_params(command_list):
-        logger.debug(f"Executing async command: {command_str}")
+    if not sensitive:
+        logger.debug("Executing async command: %s", command_str)
     else:
         logger.debug("Executing async command with sensitive parameters (not logged)")
 
     try:
-        # Execute command safely using asyncio subprocess
-        process = await asyncio.create_subprocess_exec(
-            *command_list,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=cwd,
-            env=env,
-        )
-
-        # Wait for process with timeout
+        # Spawn and wait on the shared worker pool so process creation never
+        # blocks the event loop; subprocess.run kills the child on timeout
+        loop = asyncio.get_running_loop()
         try:
-            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
-        except asyncio.TimeoutError:
-            process.kill()
-            await process.wait()
-            if not _has_sensitive_params(command_list):
+            process = await loop.run_in_executor(
+                _get_exec_pool(),
+                functools.partial(
+                    subprocess.run,
+                    command_list,
+                    shell=False,  # SECURITY: Prevents command injection
+                    capture_output=True,
+                    timeout=timeout,
+                    cwd=cwd,
+                    env=env,
+                    check=False,
+                    **_spawn_options(command_list, cwd, env, fast_spawn),
+                ),
+            )
+        except subprocess.TimeoutExpired:
+            if not sensitive:
                 logger.error(f"Async command timed out after {timeout}s: {command_str}")
             else:
                 logger.error(f"Async command with sensitive parameters timed out")
@@ -426,11 +650,11 @@ async def execute_command_async(
         exit_code = process.returncode
         success = exit_code == 0
 
-        stdout_str = stdout.decode() if stdout else ""
-        stderr_str = stderr.decode() if stderr else ""
+        stdout_str = process.stdout.decode() if process.stdout else ""
+        stderr_str = process.stderr.decode() if process.stderr else ""
 
         if not success:
-            if not _has_sensitive_params(command_list):
+            if not sensitive:
                 logger.warning(f"Async command failed with exit code {exit_code}: {command_str}")
             else:
                 logger.warning(f"Async command with sensitive parameters failed")
@@ -450,8 +674,66 @@ async def execute_command_async(
             command=command_str,
         )
 
+    except subprocess.CalledProcessError:
+        raise  # Requested by check=True; not an execution error
+
     except Exception as e:
         logger.error(f"Error executing async command: {e}")
         return CommandResult(
             exit_code=-1, stdout="", stderr=str(e), success=False, command=command_str
         )
+
+
+async def execute_commands_async(
+    commands: List[Union[str, List[str]]],
+    sudo: bool = False,
+    stop_on_error: bool = True,
+    timeout: Optional[int] = None,
+    parallel: bool = False,
+) -> List[CommandResult]:
+    """
+    Execute multiple commands asynchronously.
+
+    Args:
+        commands: List of commands (strings or argument lists)
+        sudo: Whether to use sudo
+        stop_on_error: Stop on first error; ignored when parallel is set,
+            since every command is already running
+        timeout: Per-command timeout in seconds
+        parallel: Launch all commands at once with asyncio.gather so their
+            spawn and run times overlap on the shared worker pool
+
+    Returns:
+        List[CommandResult]: Results for each command, in input order
+    """
+    if parallel:
+        outcomes = await asyncio.gather(
+            *(
+                execute_command_async(command, sudo=sudo, check=False, timeout=timeout)
+                for command in commands
+            ),
+            return_exceptions=True,
+        )
+
+        results = []
+        for command, outcome in zip(commands, outcomes):
+            if isinstance(outcome, BaseException):
+                command_str = command if isinstance(command, str) else " ".join(command)
+                outcome = CommandResult(
+                    exit_code=-1, stdout="", stderr=str(outcome), success=False, command=command_str
+                )
+            results.append(outcome)
+        return results
+
+    results = []
+
+    for command in commands:
+        result = await execute_command_async(command, sudo=sudo, check=False, timeout=timeout)
+
+        results.append(result)
+
+        if stop_on_error and not result.success:
+            logger.warning(f"Stopping async command execution due to error in: {result.command}")
+            break
+
+    return results
@@ -4,18 +4,186 @@ This module handles creation and management of fail2ban jail configurations
 for SSH and WireGuard protection.
 """
 
+import functools
+import re
+import socket
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-
-from jinja2 import Template
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from ..utils.logging import get_logger
-from .commands import execute_command
+from .commands import CommandResult, execute_command, execute_command_pool
 from .files import FileManager
 from .services import ServiceManager, ServiceStatus
 
 logger = get_logger(__name__)
 
+# Jail configuration templates, filled with str.format_map
+_SSH_JAIL_TEMPLATE = """# SSH jail configuration - Created by VPNHD
+[sshd]
+enabled = true
+port = {port}
+filter = sshd
+logpath = /var/log/auth.log
+maxretry = {max_retry}
+findtime = {find_time}
+bantime = {ban_time}
+backend = systemd
+"""
+
+_WIREGUARD_JAIL_TEMPLATE = """# WireGuard jail configuration - Created by VPNHD
+[wireguard]
+enabled = true
+port = {port}
+protocol = udp
+filter = wireguard
+logpath = /var/log/kern.log
+maxretry = {max_retry}
+findtime = {find_time}
+bantime = {ban_time}
+backend = systemd
+"""
+
+# WireGuard filter configuration; fully constant, so stored ready to write.
+# prefregex rejects non-WireGuard kernel lines once, before any failregex runs;
+# the failregexes are anchored and use <ADDR> so fail2ban never does DNS lookups.
+_WIREGUARD_FILTER = rb"""# WireGuard filter - Created by VPNHD
+[Definition]
+prefregex = ^.*?kernel:[^:]*wireguard: (?:[^:\s]+: )?<F-CONTENT>.+</F-CONTENT>$
+failregex = ^Invalid handshake initiation from <ADDR>
+            ^Handshake for peer \S+ did not complete after \d+ seconds, retrying from <ADDR>
+ignoreregex =
+"""
+
+# Pattern for the jail list in `fail2ban-client status` output
+_RE_JAIL_LIST = re.compile(r"Jail list:\s+(.+)")
+
+# Control socket of a running fail2ban server
+_FAIL2BAN_SOCKET = Path("/var/run/fail2ban/fail2ban.sock")
+
+# Seconds a `fail2ban-client status` result is reused, so bursty polls share one call
+_STATUS_CACHE_TTL = 1.0
+
+# Characters fail2ban-client draws in front of each status line
+_STATUS_TREE_CHARS = " \t|`-"
+
+# `fail2ban-client status <jail>` label -> (status key, value converter)
+_JAIL_STATUS_FIELDS = {
+    "Filter": ("filter", str),
+    "Currently failed": ("currently_failed", int),
+    "Total failed": ("total_failed", int),
+    "Currently banned": ("currently_banned", int),
+    "Total banned": ("total_banned", int),
+}
+
+
+def _iter_status_fields(status_output: str) -> Iterator[Tuple[str, str]]:
+    """Yield (label, value) pairs from fail2ban-client status output.
+
+    Args:
+        status_output: Output from fail2ban-client status command
+
+    Yields:
+        Tuples of stripped label and value for every "label: value" line
+    """
+    for line in status_output.splitlines():
+        label, sep, value = line.lstrip(_STATUS_TREE_CHARS).partition(":")
+        if sep:
+            yield label.rstrip(), value.strip()
+
+
+def _write_if_changed(path: Path, data: bytes) -> bool:
+    """Write data to path unless the file already holds exactly these bytes.
+
+    Args:
+        path: File to write
+        data: New file contents
+
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    try:
+        # A size mismatch settles it without reading the file
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+
+    path.write_bytes(data)
+    return True
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_banned_ips_cached(status_output: str) -> Tuple[str, ...]:
+    """Extract banned IPs from status output, caching by output text.
+
+    Args:
+        status_output: Output from fail2ban-client status command
+
+    Returns:
+        Tuple of banned IP addresses
+    """
+    # Single pass over the output for the ban count and the IP list
+    banned_count = 0
+    ip_list = ""
+    for label, value in _iter_status_fields(status_output):
+        if label == "Currently banned" and value.isdigit():
+            banned_count = int(value)
+        elif label == "Banned IP list":
+            ip_list = value
+
+    return tuple(ip_list.split()) if banned_count > 0 else ()
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_jail_status_cached(status_output: str) -> Tuple[Tuple[str, Any], ...]:
+    """Extract jail status fields from status output, caching by output text.
+
+    Args:
+        status_output: Output from fail2ban-client status <jail> command
+
+    Returns:
+        Tuple of (status key, value) pairs
+    """
+    fields = []
+    for label, value in _iter_status_fields(status_output):
+        field = _JAIL_STATUS_FIELDS.get(label)
+        if field is None or not value:
+            continue
+        key, convert = field
+        if convert is int and not value.isdigit():
+            continue
+        fields.append((key, convert(value)))
+    return tuple(fields)
+
+
+@functools.lru_cache(maxsize=64)
+def _read_jail_cached(path_str: str, mtime_ns: int, size: int) -> str:
+    """Read a jail file, caching by path, modification time and size.
+
+    Args:
+        path_str: Jail file path
+        mtime_ns: File modification time in nanoseconds (cache key only)
+        size: File size in bytes (cache key only)
+
+    Returns:
+        File contents
+    """
+    return Path(path_str).read_text()
+
+
+def _read_jail(jail_path: Path) -> str:
+    """Read a jail file, reusing the cached text while the file is unchanged.
+
+    Args:
+        jail_path: Jail file path
+
+    Returns:
+        File contents
+    """
+    st = jail_path.stat()
+    return _read_jail_cached(str(jail_path), st.st_mtime_ns, st.st_size)
+
 
 class Fail2banConfigManager:
     """Manages fail2ban configuration and jails."""
@@ -29,6 +197,8 @@ class Fail2banConfigManager:
         self.jail_dir = Path(jail_dir)
         self.file_manager = FileManager()
         self.service_manager = ServiceManager()
+        self._reload_pending = False
+        self._status_cache: Dict[Tuple[str, ...], Tuple[float, CommandResult]] = {}
 
     def create_ssh_jail(
         self,
@@ -36,6 +206,7 @@ class Fail2banConfigManager:
         find_time: int = 600,
         max_retry: int = 5,
         port: int = 22,
+        defer_reload: bool = False,
     ) -> bool:
         """Create a custom SSH jail configuration.
 
@@ -44,6 +215,7 @@ class Fail2banConfigManager:
             find_time: Time window in seconds to count retries (default: 600 = 10 min)
             max_retry: Maximum number of failures before ban (default: 5)
             port: SSH port to protect (default: 22)
+            defer_reload: Leave the reload to a later flush_reload() call
 
         Returns:
             True if jail was created successfully, False otherwise
@@ -55,37 +227,36 @@ class Fail2banConfigManager:
             self.jail_dir.mkdir(parents=True, exist_ok=True)
 
             # Create jail configuration
-            jail_config = f"""# SSH jail configuration - Created by VPNHD
-[sshd]
-enabled = true
-port = {port}
-filter = sshd
-logpath = /var/log/auth.log
-maxretry = {max_retry}
-findtime = {find_time}
-bantime = {ban_time}
-backend = systemd
-"""
+            jail_config = _SSH_JAIL_TEMPLATE.format_map(
+                {"port": port, "max_retry": max_retry, "find_time": find_time, "ban_time": ban_time}
+            )
 
             # Write jail file
             jail_path = self.jail_dir / "sshd.local"
-            jail_path.write_text(jail_config)
+            if not _write_if_changed(jail_path, jail_config.encode()):
+                logger.debug("SSH jail unchanged, skipping write and reload: %s", jail_path)
+                return True
 
-            logger.info(f"Created SSH jail configuration: {jail_path}")
+            logger.info("Created SSH jail configuration: %s", jail_path)
 
             # Reload fail2ban
-            if not self.reload_fail2ban():
+            if not self._reload_or_defer(defer_reload):
                 logger.error("Failed to reload fail2ban")
                 return False
 
             return True
 
         except Exception as e:
-            logger.exception(f"Error creating SSH jail: {e}")
+            logger.exception("Error creating SSH jail: %s", e)
             return False
 
     def create_wireguard_jail(
-        self, ban_time: int = 7200, find_time: int = 600, max_retry: int = 3, port: int = 51820
+        self,
+        ban_time: int = 7200,
+        find_time: int = 600,
+        max_retry: int = 3,
+        port: int = 51820,
+        defer_reload: bool = False,
     ) -> bool:
         """Create a custom WireGuard jail configuration.
 
@@ -96,6 +267,7 @@ backend = systemd
             find_time: Time window in seconds to count retries (default: 600 = 10 min)
             max_retry: Maximum number of failures before ban (default: 3)
             port: WireGuard port to protect (default: 51820)
+            defer_reload: Leave the reload to a later flush_reload() call
 
         Returns:
             True if jail was created successfully, False otherwise
@@ -110,47 +282,34 @@ backend = systemd
             filter_dir = Path("/etc/fail2ban/filter.d")
             filter_dir.mkdir(parents=True, exist_ok=True)
 
-            # WireGuard filter configuration
-            filter_config = """# WireGuard filter - Created by VPNHD
-[Definition]
-failregex = .*kernel:.*wireguard.*: Invalid handshake initiation from <HOST>.*
-            .*kernel:.*wireguard.*: Handshake for peer .* did not complete after .* seconds, retrying from <HOST>
-ignoreregex =
-"""
-
             filter_path = filter_dir / "wireguard.conf"
-            filter_path.write_text(filter_config)
-
-            logger.info(f"Created WireGuard filter: {filter_path}")
+            filter_changed = _write_if_changed(filter_path, _WIREGUARD_FILTER)
+            if filter_changed:
+                logger.info("Created WireGuard filter: %s", filter_path)
 
             # Create jail configuration
-            jail_config = f"""# WireGuard jail configuration - Created by VPNHD
-[wireguard]
-enabled = true
-port = {port}
-protocol = udp
-filter = wireguard
-logpath = /var/log/kern.log
-maxretry = {max_retry}
-findtime = {find_time}
-bantime = {ban_time}
-backend = systemd
-"""
+            jail_config = _WIREGUARD_JAIL_TEMPLATE.format_map(
+                {"port": port, "max_retry": max_retry, "find_time": find_time, "ban_time": ban_time}
+            )
 
             jail_path = self.jail_dir / "wireguard.local"
-            jail_path.write_text(jail_config)
+            jail_changed = _write_if_changed(jail_path, jail_config.encode())
+            if jail_changed:
+                logger.info("Created WireGuard jail configuration: %s", jail_path)
 
-            logger.info(f"Created WireGuard jail configuration: {jail_path}")
+            if not (filter_changed or jail_changed):
+                logger.debug("WireGuard jail unchanged, skipping reload")
+                return True
 
             # Reload fail2ban
-            if not self.reload_fail2ban():
+            if not self._reload_or_defer(defer_reload):
                 logger.error("Failed to reload fail2ban")
                 return False
 
             return True
 
         except Exception as e:
-            logger.exception(f"Error creating WireGuard jail: {e}")
+            logger.exception("Error creating WireGuard jail: %s", e)
             return False
 
     def configure_ban_settings(
@@ -168,70 +327,88 @@ backend = systemd
         """
         return {"ban_time": ban_time, "find_time": find_time, "max_retry": max_retry}
 
-    def enable_jails(self, jail_names: List[str]) -> bool:
+    def enable_jails(self, jail_names: List[str], defer_reload: bool = False) -> bool:
         """Enable specific jails.
 
         Args:
             jail_names: List of jail names to enable (e.g., ["sshd", "wireguard"])
+            defer_reload: Leave the reload to a later flush_reload() call
 
         Returns:
             True if all jails were enabled successfully, False otherwise
         """
         try:
+            changed = False
             for jail_name in jail_names:
                 jail_path = self.jail_dir / f"{jail_name}.local"
 
                 if not jail_path.exists():
-                    logger.warning(f"Jail file not found: {jail_path}")
+                    logger.warning("Jail file not found: %s", jail_path)
                     continue
 
                 # Read current configuration
-                config = jail_path.read_text()
+                config = _read_jail(jail_path)
 
-                # Update enabled status
+                # Update enabled status; jails already in the wanted state are left alone
                 if "enabled = false" in config:
                     config = config.replace("enabled = false", "enabled = true")
                     jail_path.write_text(config)
-                    logger.info(f"Enabled jail: {jail_name}")
+                    changed = True
+                    logger.info("Enabled jail: %s", jail_name)
+                else:
+                    logger.debug("Jail already enabled: %s", jail_name)
+
+            if not changed:
+                return True
 
             # Reload fail2ban to apply changes
-            return self.reload_fail2ban()
+            self.invalidate_status_cache()
+            return self._reload_or_defer(defer_reload)
 
         except Exception as e:
-            logger.exception(f"Error enabling jails: {e}")
+            logger.exception("Error enabling jails: %s", e)
             return False
 
-    def disable_jails(self, jail_names: List[str]) -> bool:
+    def disable_jails(self, jail_names: List[str], defer_reload: bool = False) -> bool:
         """Disable specific jails.
 
         Args:
             jail_names: List of jail names to disable
+            defer_reload: Leave the reload to a later flush_reload() call
 
         Returns:
             True if all jails were disabled successfully, False otherwise
         """
         try:
+            changed = False
             for jail_name in jail_names:
                 jail_path = self.jail_dir / f"{jail_name}.local"
 
                 if not jail_path.exists():
-                    logger.warning(f"Jail file not found: {jail_path}")
+                    logger.warning("Jail file not found: %s", jail_path)
                     continue
 
                 # Read current configuration
-                config = jail_path.read_text()
+                config = _read_jail(jail_path)
 
-                # Update enabled status
+                # Update enabled status; jails already in the wanted state are left alone
                 if "enabled = true" in config:
                     config = config.replace("enabled = true", "enabled = false")
                     jail_path.write_text(config)
-                    logger.info(f"Disabled jail: {jail_name}")
+                    changed = True
+                    logger.info("Disabled jail: %s", jail_name)
+                else:
+                    logger.debug("Jail already disabled: %s", jail_name)
+
+            if not changed:
+                return True
 
             # Reload fail2ban to apply changes
-            return self.reload_fail2ban()
+            self.invalidate_status_cache()
+            return self._reload_or_defer(defer_reload)
 
         except Exception as e:
-            logger.exception(f"Error disabling jails: {e}")
+            logger.exception("Error disabling jails: %s", e)
             return False
 
     def get_banned_ips(self, jail_name: Optional[str] = None) -> List[Dict[str, str]]:
@@ -243,65 +420,69 @@ backend = systemd
         Returns:
             List of dictionaries with jail name and banned IP information
         """
-        banned_ips = []
+        return [
+            {"jail": jail, "ip": ip}
+            for jail, ips in self.get_banned_ips_by_jail(jail_name).items()
+            for ip in ips
+        ]
+
+    def get_banned_ips_by_jail(self, jail_name: Optional[str] = None) -> Dict[str, List[str]]:
+        """Get currently banned IPs, grouped by jail.
+
+        Args:
+            jail_name: Optional specific jail to check (checks all jails if None)
+
+        Returns:
+            Dictionary mapping jail name to its banned IP addresses; jails
+            without bans are omitted
+        """
+        banned_ips: Dict[str, List[str]] = {}
 
         try:
             if jail_name:
                 # Get banned IPs for specific jail
-                result = execute_command(["fail2ban-client", "status", jail_name])
+                result = self._cached_status(jail_name)
                 if result.success:
-                    banned_ips.extend(self._parse_banned_ips(result.stdout, jail_name))
+                    ips = self._parse_banned_ips(result.stdout)
+                    if ips:
+                        banned_ips[jail_name] = ips
             else:
                 # Get all active jails
-                result = execute_command(["fail2ban-client", "status"])
+                result = self._cached_status()
                 if result.success:
                     # Extract jail names from status output
-                    import re
-
-                    jail_match = re.search(r"Jail list:\s+(.+)", result.stdout)
+                    jail_match = _RE_JAIL_LIST.search(result.stdout)
                     if jail_match:
                         jails = [j.strip() for j in jail_match.group(1).split(",")]
 
-                        # Get banned IPs for each jail
-                        for jail in jails:
-                            jail_result = execute_command(["fail2ban-client", "status", jail])
+                        # Query every jail concurrently on the shared command pool
+                        jail_results = self._cached_statuses([(jail,) for jail in jails])
+                        for jail, jail_result in zip(jails, jail_results):
                             if jail_result.success:
-                                banned_ips.extend(self._parse_banned_ips(jail_result.stdout, jail))
+                                ips = self._parse_banned_ips(jail_result.stdout)
+                                if ips:
+                                    banned_ips[jail] = ips
 
         except Exception as e:
-            logger.exception(f"Error getting banned IPs: {e}")
+            logger.exception("Error getting banned IPs: %s", e)
 
         return banned_ips
 
-    def _parse_banned_ips(self, status_output: str, jail_name: str) -> List[Dict[str, str]]:
+    def _parse_banned_ips(self, status_output: str) -> List[str]:
         """Parse fail2ban status output to extract banned IPs.
 
         Args:
             status_output: Output from fail2ban-client status command
-            jail_name: Name of the jail
 
         Returns:
-            List of dictionaries with IP information
+            List of banned IP addresses
         """
-        banned_ips = []
-
         try:
-            import re
-
-            # Look for "Currently banned:" line
-            banned_match = re.search(r"Currently banned:\s+(\d+)", status_output)
-            if banned_match and int(banned_match.group(1)) > 0:
-                # Extract IP list
-                ip_match = re.search(r"Banned IP list:\s+(.+)", status_output)
-                if ip_match:
-                    ips = [ip.strip() for ip in ip_match.group(1).split()]
-                    for ip in ips:
-                        banned_ips.append({"jail": jail_name, "ip": ip})
+            return list(_parse_banned_ips_cached(status_output))
 
         except Exception as e:
-            logger.exception(f"Error parsing banned IPs: {e}")
-
-        return banned_ips
+            logger.exception("Error parsing banned IPs: %s", e)
+            return []
 
     def unban_ip(self, ip: str, jail_name: Optional[str] = None) -> bool:
         """Unban a specific IP address.
@@ -316,30 +497,31 @@ backend = systemd
         try:
             if jail_name:
                 result = execute_command(["fail2ban-client", "set", jail_name, "unbanip", ip])
+                self.invalidate_status_cache()
                 if result.success:
-                    logger.info(f"Unbanned {ip} from {jail_name}")
+                    logger.info("Unbanned %s from %s", ip, jail_name)
                     return True
                 else:
-                    logger.error(f"Failed to unban {ip} from {jail_name}")
+                    logger.error("Failed to unban %s from %s", ip, jail_name)
                     return False
             else:
                 # Unban from all jails
                 # Get list of active jails
-                result = execute_command(["fail2ban-client", "status"])
+                result = self._cached_status()
                 if result.success:
-                    import re
-
-                    jail_match = re.search(r"Jail list:\s+(.+)", result.stdout)
+                    jail_match = _RE_JAIL_LIST.search(result.stdout)
                     if jail_match:
                         jails = [j.strip() for j in jail_match.group(1).split(",")]
 
+                        jail_results = execute_command_pool(
+                            [["fail2ban-client", "set", jail, "unbanip", ip] for jail in jails]
+                        )
+                        self.invalidate_status_cache()
+
                         success = True
-                        for jail in jails:
-                            result = execute_command(
-                                ["fail2ban-client", "set", jail, "unbanip", ip]
-                            )
-                            if result.success:
-                                logger.info(f"Unbanned {ip} from {jail}")
+                        for jail, jail_result in zip(jails, jail_results):
+                            if jail_result.success:
+                                logger.info("Unbanned %s from %s", ip, jail)
                             else:
                                 success = False
 
@@ -348,7 +530,7 @@ backend = systemd
                 return False
 
         except Exception as e:
-            logger.exception(f"Error unbanning IP: {e}")
+            logger.exception("Error unbanning IP: %s", e)
             return False
 
     def reload_fail2ban(self) -> bool:
@@ -358,24 +540,112 @@ backend = systemd
             True if reload was successful, False otherwise
         """
         try:
-            result = execute_command("fail2ban-client reload")
+            result = execute_command(["fail2ban-client", "reload"])
+            self.invalidate_status_cache()
             if result.success:
+                self._reload_pending = False
                 logger.info("fail2ban reloaded successfully")
                 return True
             else:
-                logger.error(f"Failed to reload fail2ban: {result.stderr}")
+                logger.error("Failed to reload fail2ban: %s", result.stderr)
                 return False
 
         except Exception as e:
-            logger.exception(f"Error reloading fail2ban: {e}")
+            logger.exception("Error reloading fail2ban: %s", e)
             return False
 
+    def _reload_or_defer(self, defer_reload: bool) -> bool:
+        """Reload fail2ban now, or mark a reload as pending.
+
+        Args:
+            defer_reload: Only record that a reload is needed
+
+        Returns:
+            True if the reload succeeded or was deferred, False otherwise
+        """
+        if defer_reload:
+            self._reload_pending = True
+            return True
+        return self.reload_fail2ban()
+
+    def flush_reload(self) -> bool:
+        """Apply reloads deferred with defer_reload=True in a single reload.
+
+        Returns:
+            True if nothing was pending or the reload succeeded, False otherwise
+        """
+        if not self._reload_pending:
+            return True
+        return self.reload_fail2ban()
+
+    def _cached_status(self, *args: str) -> CommandResult:
+        """Run `fail2ban-client status [jail]`, reusing a recent result.
+
+        Args:
+            *args: Extra arguments after `status` (a jail name, or none)
+
+        Returns:
+            CommandResult: Command result, at most _STATUS_CACHE_TTL seconds old
+        """
+        return self._cached_statuses([args])[0]
+
+    def _cached_statuses(self, arg_lists: List[Tuple[str, ...]]) -> List[CommandResult]:
+        """Run several `fail2ban-client status` queries, reusing recent results.
+
+        Queries without a fresh cached result run concurrently on the shared
+        command pool.
+
+        Args:
+            arg_lists: Extra arguments after `status` for each query
+
+        Returns:
+            List[CommandResult]: Results for each query, in input order
+        """
+        now = time.monotonic()
+        results: Dict[Tuple[str, ...], CommandResult] = {}
+        stale = []
+        for args in arg_lists:
+            cached = self._status_cache.get(args)
+            if cached is not None and now - cached[0] < _STATUS_CACHE_TTL:
+                results[args] = cached[1]
+            else:
+                stale.append(args)
+
+        if stale:
+            commands = [["fail2ban-client", "status", *args] for args in stale]
+            if len(commands) == 1:
+                fresh = [execute_command(commands[0])]
+            else:
+                fresh = execute_command_pool(commands)
+            for args, result in zip(stale, fresh):
+                results[args] = result
+                if result.success:
+                    self._status_cache[args] = (now, result)
+
+        return [results[args] for args in arg_lists]
+
+    def invalidate_status_cache(self) -> None:
+        """Forget cached `fail2ban-client status` results."""
+        self._status_cache.clear()
+
     def is_fail2ban_running(self) -> bool:
         """Check if fail2ban service is running.
 
+        A fail2ban server accepting connections on its control socket is
+        running; systemd is only asked when the socket cannot be reached.
+
         Returns:
             True if running, False otherwise
         """
+        if _FAIL2BAN_SOCKET.exists():
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.settimeout(0.1)
+                    sock.connect(str(_FAIL2BAN_SOCKET))
+                return True
+            except OSError:
+                pass  # Stale socket or no permission; ask systemd instead
+
         return self.service_manager.get_service_status("fail2ban") == ServiceStatus.ACTIVE
 
     def get_jail_status(self, jail_name: str) -> Optional[Dict[str, Any]]:
@@ -388,37 +658,17 @@ backend = systemd
             Dictionary with jail status information, or None on error
         """
         try:
-            result = execute_command(["fail2ban-client", "status", jail_name])
+            result = self._cached_status(jail_name)
             if not result.success:
                 return None
 
-            import re
-
             status = {"jail_name": jail_name}
 
-            # Parse status output
-            filter_match = re.search(r"Filter\s*:\s*(.+)", result.stdout)
-            if filter_match:
-                status["filter"] = filter_match.group(1).strip()
-
-            currently_failed = re.search(r"Currently failed:\s+(\d+)", result.stdout)
-            if currently_failed:
-                status["currently_failed"] = int(currently_failed.group(1))
-
-            total_failed = re.search(r"Total failed:\s+(\d+)", result.stdout)
-            if total_failed:
-                status["total_failed"] = int(total_failed.group(1))
-
-            currently_banned = re.search(r"Currently banned:\s+(\d+)", result.stdout)
-            if currently_banned:
-                status["currently_banned"] = int(currently_banned.group(1))
-
-            total_banned = re.search(r"Total banned:\s+(\d+)", result.stdout)
-            if total_banned:
-                status["total_banned"] = int(total_banned.group(1))
+            # Parse status output (consecutive identical outputs are parsed once)
+            status.update(_parse_jail_status_cached(result.stdout))
 
             return status
 
         except Exception as e:
-            logger.exception(f"Error getting jail status: {e}")
+            logger.exception("Error getting jail status: %s", e)
             return None
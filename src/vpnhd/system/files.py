@@ -1,7 +1,8 @@
 """File system operation utilities for VPNHD."""
 
-import filecmp
+import os
 import shutil
+import tempfile
 from pathlib import Path
 from typing import List, Optional
 
@@ -10,6 +11,53 @@ from ..utils.helpers import calculate_file_hash, ensure_directory_exists
 from ..utils.logging import get_logger
 from .commands import execute_command, run_command_with_input
 
+# Read size for files_are_identical; stops at the first differing chunk
+_COMPARE_CHUNK_SIZE = 1024 * 1024
+
+# Files at least this large are copied in-kernel with os.copy_file_range
+_COPY_RANGE_MIN_SIZE = 8 * 1024
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _copy_file(source: Path, destination: Path, preserve_metadata: bool = True) -> None:
+    """
+    Copy a file, using an in-kernel copy for larger files where available.
+
+    os.copy_file_range never moves the data through user space and can be a
+    reflink on btrfs/xfs. Small files, and filesystems that reject the
+    syscall, go through shutil instead.
+
+    Args:
+        source: Source file path
+        destination: Destination file or directory path
+        preserve_metadata: Copy timestamps and flags as well as permissions
+
+    Raises:
+        shutil.SameFileError: If source and destination are the same file
+    """
+    if destination.is_dir():
+        destination = destination / source.name
+
+    # Opening the destination for writing would truncate the source first
+    if destination.exists() and os.path.samefile(source, destination):
+        raise shutil.SameFileError(f"{source} and {destination} are the same file")
+
+    if hasattr(os, "copy_file_range") and source.stat().st_size >= _COPY_RANGE_MIN_SIZE:
+        try:
+            with open(source, "rb") as fsrc, open(destination, "wb") as fdst:
+                while os.copy_file_range(fsrc.fileno(), fdst.fileno(), _COPY_CHUNK_SIZE):
+                    pass
+        except OSError:
+            # e.g. EXDEV/EINVAL on filesystems without support; shutil copes
+            shutil.copyfile(source, destination)
+    else:
+        shutil.copyfile(source, destination)
+
+    if preserve_metadata:
+        shutil.copystat(source, destination)
+    else:
+        shutil.copymode(source, destination)
+
 
 class FileManager:
     """Manages file system operations."""
@@ -29,19 +77,19 @@ class FileManager:
         Returns:
             Optional[Path]: Path to backup file or None if failed
         """
-        if not file_path.exists():
-            self.logger.warning(f"Cannot backup non-existent file: {file_path}")
-            return None
-
         backup_path = Path(str(file_path) + backup_suffix)
 
         try:
-            shutil.copy2(file_path, backup_path)
-            self.logger.info(f"Backed up {file_path} to {backup_path}")
+            _copy_file(file_path, backup_path)
+            self.logger.info("Backed up %s to %s", file_path, backup_path)
             return backup_path
 
+        except FileNotFoundError:
+            self.logger.warning("Cannot backup non-existent file: %s", file_path)
+            return None
+
         except Exception as e:
-            self.logger.error(f"Failed to backup file: {e}")
+            self.logger.error("Failed to backup file: %s", e)
             return None
 
     def restore_backup(self, backup_path: Path, original_path: Path) -> bool:
@@ -55,17 +103,17 @@ class FileManager:
         Returns:
             bool: True if restored successfully
         """
-        if not backup_path.exists():
-            self.logger.error(f"Backup file not found: {backup_path}")
-            return False
-
         try:
             shutil.copy2(backup_path, original_path)
-            self.logger.info(f"Restored {original_path} from {backup_path}")
+            self.logger.info("Restored %s from %s", original_path, backup_path)
             return True
 
+        except FileNotFoundError:
+            self.logger.error("Backup file not found: %s", backup_path)
+            return False
+
         except Exception as e:
-            self.logger.error(f"Failed to restore backup: {e}")
+            self.logger.error("Failed to restore backup: %s", e)
             return False
 
     def safe_write_file(
@@ -99,12 +147,14 @@ class FileManager:
 
             if sudo:
                 # Write to temp file first, then move with sudo
-                import tempfile
-
                 with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp:
                     tmp.write(content)
                     tmp_path = tmp.name
 
+                # We own the temp file, so set permissions before the move;
+                # mv keeps them, which saves a separate sudo chmod
+                os.chmod(tmp_path, mode)
+
                 # Move to final location with sudo
                 result = execute_command(["mv", tmp_path, str(file_path)], sudo=True, check=False)
 
@@ -112,19 +162,31 @@ class FileManager:
                     Path(tmp_path).unlink(missing_ok=True)
                     return False
 
-                # Set permissions
-                execute_command(["chmod", oct(mode)[2:], str(file_path)], sudo=True, check=False)
-
             else:
-                # Write directly
-                file_path.write_text(content)
-                file_path.chmod(mode)
+                # Write a sibling temp file and rename it over the target, so
+                # readers see either the old or the new content, never a mix.
+                # A symlinked target is resolved first so the write still goes
+                # through to the file it points at, as a plain open() would.
+                target = file_path.resolve()
+                fd, tmp_path = tempfile.mkstemp(
+                    dir=target.parent, prefix=f".{target.name}.", suffix=".tmp"
+                )
+                try:
+                    with os.fdopen(fd, "w") as f:
+                        os.fchmod(f.fileno(), mode)  # mkstemp always creates 0600
+                        f.write(content)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_path, target)
+                except BaseException:
+                    Path(tmp_path).unlink(missing_ok=True)
+                    raise
 
-            self.logger.info(f"Wrote file: {file_path}")
+            self.logger.info("Wrote file: %s", file_path)
             return True
 
         except Exception as e:
-            self.logger.error(f"Failed to write file: {e}")
+            self.logger.error("Failed to write file: %s", e)
             return False
 
     def safe_read_file(self, file_path: Path, sudo: bool = False) -> Optional[str]:
@@ -138,26 +200,46 @@ class FileManager:
         Returns:
             Optional[str]: File content or None if failed
         """
+        data = self.safe_read_bytes(file_path, sudo=sudo)
+        if data is None:
+            return None
+
+        try:
+            return data.decode()
+        except Exception as e:
+            self.logger.error("Failed to read file: %s", e)
+            return None
+
+    def safe_read_bytes(self, file_path: Path, sudo: bool = False) -> Optional[bytes]:
+        """
+        Safely read raw content from a file.
+
+        Args:
+            file_path: Path to file
+            sudo: Whether to use sudo for reading
+
+        Returns:
+            Optional[bytes]: File content or None if failed
+        """
         try:
             if not file_path.exists():
-                self.logger.warning(f"File not found: {file_path}")
+                self.logger.warning("File not found: %s", file_path)
                 return None
 
             if sudo:
-                result = execute_command(
-                    ["cat", str(file_path)], sudo=True, check=False, capture_output=True
-                )
+                # Capture cat's output as bytes, without a text wrapper
+                result = execute_command(["cat", str(file_path)], sudo=True, text=False)
 
                 if result.success:
-                    return result.stdout
+                    return result.stdout_bytes
                 else:
                     return None
 
             else:
-                return file_path.read_text()
+                return file_path.read_bytes()
 
         except Exception as e:
-            self.logger.error(f"Failed to read file: {e}")
+            self.logger.error("Failed to read file: %s", e)
             return None
 
     def append_to_file(self, file_path: Path, content: str, sudo: bool = False) -> bool:
@@ -189,7 +271,7 @@ class FileManager:
                 return True
 
         except Exception as e:
-            self.logger.error(f"Failed to append to file: {e}")
+            self.logger.error("Failed to append to file: %s", e)
             return False
 
     def delete_file(self, file_path: Path, sudo: bool = False) -> bool:
@@ -204,21 +286,22 @@ class FileManager:
             bool: True if deletion succeeded
         """
         try:
-            if not file_path.exists():
-                self.logger.debug(f"File already deleted: {file_path}")
-                return True
-
             if sudo:
+                # rm -f succeeds for a missing file, so no existence check is needed
                 result = execute_command(["rm", "-f", str(file_path)], sudo=True, check=False)
                 return result.success
 
             else:
                 file_path.unlink()
-                self.logger.info(f"Deleted file: {file_path}")
+                self.logger.info("Deleted file: %s", file_path)
                 return True
 
+        except FileNotFoundError:
+            self.logger.debug("File already deleted: %s", file_path)
+            return True
+
         except Exception as e:
-            self.logger.error(f"Failed to delete file: {e}")
+            self.logger.error("Failed to delete file: %s", e)
             return False
 
     def copy_file(
@@ -237,8 +320,10 @@ class FileManager:
             bool: True if copy succeeded
         """
         try:
-            if not source.exists():
-                self.logger.error(f"Source file not found: {source}")
+            # In-process operations raise FileNotFoundError themselves; only
+            # sudo commands need the check up front for a clear error
+            if sudo and not source.exists():
+                self.logger.error("Source file not found: %s", source)
                 return False
 
             ensure_directory_exists(destination.parent)
@@ -253,16 +338,17 @@ class FileManager:
                 return result.success
 
             else:
-                if preserve_permissions:
-                    shutil.copy2(source, destination)
-                else:
-                    shutil.copy(source, destination)
+                _copy_file(source, destination, preserve_metadata=preserve_permissions)
 
-                self.logger.info(f"Copied {source} to {destination}")
+                self.logger.info("Copied %s to %s", source, destination)
                 return True
 
+        except FileNotFoundError:
+            self.logger.error("Source file not found: %s", source)
+            return False
+
         except Exception as e:
-            self.logger.error(f"Failed to copy file: {e}")
+            self.logger.error("Failed to copy file: %s", e)
             return False
 
     def move_file(self, source: Path, destination: Path, sudo: bool = False) -> bool:
@@ -278,8 +364,10 @@ class FileManager:
             bool: True if move succeeded
         """
         try:
-            if not source.exists():
-                self.logger.error(f"Source file not found: {source}")
+            # In-process operations raise FileNotFoundError themselves; only
+            # sudo commands need the check up front for a clear error
+            if sudo and not source.exists():
+                self.logger.error("Source file not found: %s", source)
                 return False
 
             ensure_directory_exists(destination.parent)
@@ -292,11 +380,15 @@ class FileManager:
 
             else:
                 shutil.move(str(source), str(destination))
-                self.logger.info(f"Moved {source} to {destination}")
+                self.logger.info("Moved %s to %s", source, destination)
                 return True
 
+        except FileNotFoundError:
+            self.logger.error("Source file not found: %s", source)
+            return False
+
         except Exception as e:
-            self.logger.error(f"Failed to move file: {e}")
+            self.logger.error("Failed to move file: %s", e)
             return False
 
     def set_permissions(self, file_path: Path, mode: int, sudo: bool = False) -> bool:
@@ -312,23 +404,27 @@ class FileManager:
             bool: True if permissions set successfully
         """
         try:
-            if not file_path.exists():
-                self.logger.error(f"File not found: {file_path}")
+            if sudo and not file_path.exists():
+                self.logger.error("File not found: %s", file_path)
                 return False
 
             if sudo:
                 result = execute_command(
-                    ["chmod", oct(mode)[2:], str(file_path)], sudo=True, check=False
+                    ["chmod", f"{mode:o}", str(file_path)], sudo=True, check=False
                 )
                 return result.success
 
             else:
                 file_path.chmod(mode)
-                self.logger.info(f"Set permissions {oct(mode)} on {file_path}")
+                self.logger.info("Set permissions %#o on %s", mode, file_path)
                 return True
 
+        except FileNotFoundError:
+            self.logger.error("File not found: %s", file_path)
+            return False
+
         except Exception as e:
-            self.logger.error(f"Failed to set permissions: {e}")
+            self.logger.error("Failed to set permissions: %s", e)
             return False
 
     def set_owner(
@@ -348,7 +444,7 @@ class FileManager:
         """
         try:
             if not file_path.exists():
-                self.logger.error(f"File not found: {file_path}")
+                self.logger.error("File not found: %s", file_path)
                 return False
 
             owner_spec = owner
@@ -358,12 +454,12 @@ class FileManager:
             result = execute_command(["chown", owner_spec, str(file_path)], sudo=sudo, check=False)
 
             if result.success:
-                self.logger.info(f"Set owner {owner_spec} on {file_path}")
+                self.logger.info("Set owner %s on %s", owner_spec, file_path)
 
             return result.success
 
         except Exception as e:
-            self.logger.error(f"Failed to set owner: {e}")
+            self.logger.error("Failed to set owner: %s", e)
             return False
 
     def files_are_identical(self, file1: Path, file2: Path) -> bool:
@@ -377,11 +473,18 @@ class FileManager:
         Returns:
             bool: True if files are identical
         """
-        if not file1.exists() or not file2.exists():
-            return False
-
         try:
-            return filecmp.cmp(file1, file2, shallow=False)
+            # Different sizes can never match; no need to open either file
+            if file1.stat().st_size != file2.stat().st_size:
+                return False
+
+            with open(file1, "rb") as f1, open(file2, "rb") as f2:
+                while True:
+                    chunk = f1.read(_COMPARE_CHUNK_SIZE)
+                    if chunk != f2.read(_COMPARE_CHUNK_SIZE):
+                        return False
+                    if not chunk:
+                        return True
         except Exception:
             return False
 
@@ -396,12 +499,9 @@ class FileManager:
             Optional[int]: File size or None if error
         """
         try:
-            if file_path.exists():
-                return file_path.stat().st_size
+            return file_path.stat().st_size
         except Exception:
-            pass
-
-        return None
+            return None
 
     def verify_file_hash(
         self, file_path: Path, expected_hash: str, algorithm: str = "sha256"
@@ -1,17 +1,137 @@
 """Package management utilities for VPNHD."""
 
+import functools
+import os
 import platform
-from typing import List, Tuple
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
 
 from ..exceptions import ValidationError
 from ..security.validators import is_valid_package_name
 from ..utils.constants import (
     COMMAND_TIMEOUT_INSTALL,
+    PACKAGE_CACHE_TTL,
     REQUIRED_PACKAGES_DEBIAN,
     REQUIRED_PACKAGES_FEDORA,
 )
 from ..utils.logging import get_logger
-from .commands import check_command_exists, execute_command
+from .commands import check_command_exists, clear_command_cache, execute_command
+
+logger = get_logger("PackageManager")
+
+# Paths whose mtime records the last metadata refresh of each package manager
+_PACKAGE_CACHE_PATHS = {
+    "yum": "/var/cache/yum",
+    "pacman": "/var/lib/pacman/sync",
+}
+_DNF_CACHE_DIR = Path("/var/cache/dnf")
+
+# Touched by apt after every successful update (when the periodic hook is
+# installed); otherwise the per-repository index files are used
+_APT_UPDATE_STAMP = Path("/var/lib/apt/periodic/update-success-stamp")
+_APT_LISTS_DIR = Path("/var/lib/apt/lists")
+
+
+@dataclass(frozen=True)
+class _Backend:
+    """Command templates for one package manager."""
+
+    install: Tuple[str, ...]
+    remove: Tuple[str, ...]
+    update: Tuple[str, ...]
+    upgrade: Tuple[str, ...]
+    query_many: Tuple[str, ...]  # Prints one line per installed package
+    yes: str
+    update_ok_codes: Tuple[int, ...] = ()  # Non-zero exit codes that still mean success
+
+
+def _dpkg_backend(tool: str) -> _Backend:
+    """Build the backend for apt or apt-get."""
+    return _Backend(
+        install=(tool, "install"),
+        remove=(tool, "remove"),
+        update=(tool, "update"),
+        upgrade=(tool, "upgrade"),
+        query_many=("dpkg-query", "-W", "-f=${Package}\t${Status}\n"),
+        yes="-y",
+    )
+
+
+def _rpm_backend(tool: str) -> _Backend:
+    """Build the backend for dnf or yum."""
+    return _Backend(
+        install=(tool, "install"),
+        remove=(tool, "remove"),
+        update=(tool, "check-update"),
+        upgrade=(tool, "upgrade"),
+        query_many=("rpm", "-q", "--qf", "%{NAME}\n"),
+        yes="-y",
+        # check-update returns: 0 = no updates, 100 = updates available, other = error
+        update_ok_codes=(100,),
+    )
+
+
+_BACKENDS = {
+    "apt": _dpkg_backend("apt"),
+    "apt-get": _dpkg_backend("apt-get"),
+    "dnf": _rpm_backend("dnf"),
+    "yum": _rpm_backend("yum"),
+    "pacman": _Backend(
+        install=("pacman", "-S"),
+        remove=("pacman", "-R"),
+        update=("pacman", "-Sy"),
+        upgrade=("pacman", "-Syu"),
+        query_many=("pacman", "-Qq"),
+        yes="--noconfirm",
+    ),
+}
+
+
+@functools.lru_cache(maxsize=1)
+def _detect_distro_cached() -> str:
+    """
+    Detect Linux distribution, once per process.
+
+    Returns:
+        str: Distribution name (debian, ubuntu, fedora, etc.)
+    """
+    try:
+        # Try to read /etc/os-release
+        with open("/etc/os-release", "r") as f:
+            for line in f:
+                if line.startswith("ID="):
+                    distro = line.partition("=")[2].strip().strip('"')
+                    logger.debug("Detected distribution: %s", distro)
+                    return distro
+    except Exception as e:
+        logger.warning("Could not detect distribution: %s", e)
+
+    return "unknown"
+
+
+@functools.lru_cache(maxsize=1)
+def _get_package_manager_cached() -> str:
+    """
+    Get appropriate package manager for this system, once per process.
+
+    Returns:
+        str: Package manager command (apt, dnf, yum, etc.)
+    """
+    if check_command_exists("apt"):
+        return "apt"
+    elif check_command_exists("apt-get"):
+        return "apt-get"
+    elif check_command_exists("dnf"):
+        return "dnf"
+    elif check_command_exists("yum"):
+        return "yum"
+    elif check_command_exists("pacman"):
+        return "pacman"
+    else:
+        logger.warning("Could not detect package manager")
+        return "unknown"
 
 
 class PackageManager:
@@ -19,51 +139,14 @@ class PackageManager:
 
     def __init__(self):
         """Initialize package manager."""
-        self.logger = get_logger("PackageManager")
-        self.distro = self._detect_distro()
-        self.package_manager = self._get_package_manager()
-
-    def _detect_distro(self) -> str:
-        """
-        Detect Linux distribution.
-
-        Returns:
-            str: Distribution name (debian, ubuntu, fedora, etc.)
-        """
-        try:
-            # Try to read /etc/os-release
-            with open("/etc/os-release", "r") as f:
-                lines = f.readlines()
-                for line in lines:
-                    if line.startswith("ID="):
-                        distro = line.split("=")[1].strip().strip('"')
-                        self.logger.debug(f"Detected distribution: {distro}")
-                        return distro
-        except Exception as e:
-            self.logger.warning(f"Could not detect distribution: {e}")
+        self.logger = logger
+        self.distro = _detect_distro_cached()
+        self.package_manager = _get_package_manager_cached()
 
-        return "unknown"
-
-    def _get_package_manager(self) -> str:
-        """
-        Get appropriate package manager for this system.
-
-        Returns:
-            str: Package manager command (apt, dnf, yum, etc.)
-        """
-        if check_command_exists("apt"):
-            return "apt"
-        elif check_command_exists("apt-get"):
-            return "apt-get"
-        elif check_command_exists("dnf"):
-            return "dnf"
-        elif check_command_exists("yum"):
-            return "yum"
-        elif check_command_exists("pacman"):
-            return "pacman"
-        else:
-            self.logger.warning("Could not detect package manager")
-            return "unknown"
+    @property
+    def _backend(self) -> Optional[_Backend]:
+        """Command templates for the package manager, or None if unsupported."""
+        return _BACKENDS.get(self.package_manager)
 
     def is_package_installed(self, package: str) -> bool:
         """
@@ -82,19 +165,65 @@ class PackageManager:
         if not is_valid_package_name(package):
             raise ValidationError("package", package, "Invalid package name format")
 
-        if self.package_manager in ("apt", "apt-get"):
-            result = execute_command(["dpkg", "-l", package], check=False, capture_output=True)
-            return result.success
+        # Same query as installed_set, so both agree on packages dpkg lists as
+        # removed but not purged ("rc"), which "dpkg -l" would report as present
+        return package in self.installed_set([package])
+
+    def installed_set(self, packages: List[str]) -> Set[str]:
+        """
+        Find which of several packages are installed, with one query.
+
+        Args:
+            packages: Package names
+
+        Returns:
+            Set[str]: Names from packages that are installed
+
+        Raises:
+            ValidationError: If any package name is invalid
+        """
+        # SECURITY: Validate all package names first
+        for package in packages:
+            if not is_valid_package_name(package):
+                raise ValidationError("package", package, "Invalid package name format")
+
+        backend = self._backend
+        if not packages or backend is None:
+            return set()
 
-        elif self.package_manager in ("dnf", "yum"):
-            result = execute_command(["rpm", "-q", package], check=False, capture_output=True)
-            return result.success
+        # Exit status is non-zero whenever any package is missing, so only
+        # stdout is used; it lists the packages that were found
+        result = execute_command([*backend.query_many, *packages], check=False, capture_output=True)
 
-        elif self.package_manager == "pacman":
-            result = execute_command(["pacman", "-Q", package], check=False, capture_output=True)
-            return result.success
+        requested = set(packages)
+        installed = set()
+        for line in result.stdout.splitlines():
+            name, _, status = line.partition("\t")
+            if name not in requested:
+                continue  # e.g. rpm's "package foo is not installed"
+            if status and not status.endswith("ok installed"):
+                continue  # dpkg: removed but not purged, half-installed, ...
+            installed.add(name)
 
-        return False
+        return installed
+
+    def _build_install_command(self, packages: List[str], assume_yes: bool) -> Optional[List[str]]:
+        """
+        Build the install command for one or more packages.
+
+        Args:
+            packages: Already validated package names
+            assume_yes: Auto-confirm installation
+
+        Returns:
+            Optional[List[str]]: Command array, or None for unsupported package managers
+        """
+        backend = self._backend
+        if backend is None:
+            self.logger.error(f"Unsupported package manager: {self.package_manager}")
+            return None
+
+        return [*backend.install, *([backend.yes] if assume_yes else []), *packages]
 
     def install_package(self, package: str, assume_yes: bool = True) -> bool:
         """
@@ -125,30 +254,16 @@ class PackageManager:
             # Package name already validated above, but catch anyway
             raise
 
-        # Build install command as array
-        if self.package_manager in ("apt", "apt-get"):
-            cmd = [self.package_manager, "install", package]
-            if assume_yes:
-                cmd.insert(2, "-y")  # Insert -y before package name
-
-        elif self.package_manager in ("dnf", "yum"):
-            cmd = [self.package_manager, "install", package]
-            if assume_yes:
-                cmd.insert(2, "-y")
-
-        elif self.package_manager == "pacman":
-            cmd = ["pacman", "-S", package]
-            if assume_yes:
-                cmd.insert(2, "--noconfirm")
-
-        else:
-            self.logger.error(f"Unsupported package manager: {self.package_manager}")
+        cmd = self._build_install_command([package], assume_yes)
+        if cmd is None:
             return False
 
         # Execute installation
         result = execute_command(cmd, sudo=True, check=False, timeout=COMMAND_TIMEOUT_INSTALL)
 
         if result.success:
+            # The install may have added commands a cached lookup reported missing
+            clear_command_cache()
             self.logger.info(f"Successfully installed {package}")
         else:
             self.logger.error(f"Failed to install {package}")
@@ -176,17 +291,45 @@ class PackageManager:
             if not is_valid_package_name(package):
                 raise ValidationError("package", package, "Invalid package name format")
 
+        # One query for every package instead of one process each
+        installed = self.installed_set(packages)
+
         successful = []
-        failed = []
+        to_install = []
 
         for package in packages:
-            try:
-                if self.install_package(package, assume_yes):
-                    successful.append(package)
-                else:
-                    failed.append(package)
-            except ValidationError:
-                # Should not happen since we validated above, but catch anyway
+            if package in installed:
+                self.logger.info(f"Package {package} is already installed")
+                successful.append(package)
+            else:
+                to_install.append(package)
+
+        if not to_install:
+            return successful, []
+
+        cmd = self._build_install_command(to_install, assume_yes)
+        if cmd is None:
+            return successful, to_install
+
+        # Single transaction: dependencies are resolved and triggers run once
+        self.logger.info(f"Installing packages: {', '.join(to_install)}")
+        result = execute_command(cmd, sudo=True, check=False, timeout=COMMAND_TIMEOUT_INSTALL)
+
+        if result.success:
+            clear_command_cache()
+            self.logger.info(f"Successfully installed {', '.join(to_install)}")
+            successful.extend(to_install)
+            return successful, []
+
+        # The package manager aborts the whole transaction if any package fails,
+        # so fall back to one package at a time to find out which ones did
+        self.logger.warning("Batch installation failed, retrying packages individually")
+        failed = []
+
+        for package in to_install:
+            if self.install_package(package, assume_yes):
+                successful.append(package)
+            else:
                 failed.append(package)
 
         return successful, failed
@@ -200,25 +343,37 @@ class PackageManager:
         """
         self.logger.info("Updating package cache")
 
-        if self.package_manager in ("apt", "apt-get"):
-            cmd = [self.package_manager, "update"]
-            result = execute_command(cmd, sudo=True, check=False)
-            return result.success
+        backend = self._backend
+        if backend is None:
+            self.logger.error(f"Unsupported package manager: {self.package_manager}")
+            return False
 
-        elif self.package_manager in ("dnf", "yum"):
-            cmd = [self.package_manager, "check-update"]
-            result = execute_command(cmd, sudo=True, check=False)
-            # dnf/yum check-update returns: 0 = no updates, 100 = updates available, other = error
-            return result.exit_code in (0, 100)
+        result = execute_command(list(backend.update), sudo=True, check=False)
+        return result.success or result.exit_code in backend.update_ok_codes
 
-        elif self.package_manager == "pacman":
-            cmd = ["pacman", "-Sy"]
-            result = execute_command(cmd, sudo=True, check=False)
-            return result.success
+    def _cache_age_seconds(self) -> float:
+        """
+        Get the time since the package metadata was last refreshed.
 
-        else:
-            self.logger.error(f"Unsupported package manager: {self.package_manager}")
-            return False
+        Returns:
+            float: Age in seconds, or infinity if it cannot be determined
+        """
+        try:
+            if self.package_manager in ("apt", "apt-get"):
+                try:
+                    mtime = _APT_UPDATE_STAMP.stat().st_mtime
+                except FileNotFoundError:
+                    # Index files (possibly compressed) are replaced on a successful update
+                    mtime = max(path.stat().st_mtime for path in _APT_LISTS_DIR.glob("*_Packages*"))
+            elif self.package_manager == "dnf":
+                # dnf rewrites one solv file per repository on refresh
+                mtime = max(path.stat().st_mtime for path in _DNF_CACHE_DIR.glob("*.solv"))
+            else:
+                mtime = os.stat(_PACKAGE_CACHE_PATHS[self.package_manager]).st_mtime
+        except (KeyError, OSError, ValueError):
+            return float("inf")
+
+        return time.time() - mtime
 
     def upgrade_packages(self, assume_yes: bool = True) -> bool:
         """
@@ -232,25 +387,12 @@ class PackageManager:
         """
         self.logger.info("Upgrading packages")
 
-        if self.package_manager in ("apt", "apt-get"):
-            cmd = [self.package_manager, "upgrade"]
-            if assume_yes:
-                cmd.append("-y")
-
-        elif self.package_manager in ("dnf", "yum"):
-            cmd = [self.package_manager, "upgrade"]
-            if assume_yes:
-                cmd.append("-y")
-
-        elif self.package_manager == "pacman":
-            cmd = ["pacman", "-Syu"]
-            if assume_yes:
-                cmd.append("--noconfirm")
-
-        else:
+        backend = self._backend
+        if backend is None:
             self.logger.error(f"Unsupported package manager: {self.package_manager}")
             return False
 
+        cmd = [*backend.upgrade, *([backend.yes] if assume_yes else [])]
         result = execute_command(cmd, sudo=True, check=False, timeout=COMMAND_TIMEOUT_INSTALL)
 
         return result.success
@@ -278,18 +420,19 @@ class PackageManager:
             Tuple[List[str], List[str]]: (installed, missing) package lists
         """
         required = self.get_required_packages()
-        installed = []
-        missing = []
 
+        valid = []
         for package in required:
-            try:
-                if self.is_package_installed(package):
-                    installed.append(package)
-                else:
-                    missing.append(package)
-            except ValidationError as e:
+            if is_valid_package_name(package):
+                valid.append(package)
+            else:
                 self.logger.warning(f"Invalid package name in requirements: {package}")
-                missing.append(package)
+
+        # One query for every required package instead of one process each
+        installed_names = self.installed_set(valid)
+
+        installed = [package for package in required if package in installed_names]
+        missing = [package for package in required if package not in installed_names]
 
         return installed, missing
 
@@ -311,8 +454,11 @@ class PackageManager:
 
         self.logger.info(f"Installing {len(missing)} required packages")
 
-        # Update package cache first
-        self.update_package_cache()
+        # Update package cache first, unless it was refreshed recently
+        if self._cache_age_seconds() > PACKAGE_CACHE_TTL:
+            self.update_package_cache()
+        else:
+            self.logger.debug("Package cache is fresh, skipping update")
 
         # Install missing packages
         try:
@@ -348,24 +494,11 @@ class PackageManager:
 
         self.logger.info(f"Removing package: {package}")
 
-        if self.package_manager in ("apt", "apt-get"):
-            cmd = [self.package_manager, "remove", package]
-            if assume_yes:
-                cmd.insert(2, "-y")
-
-        elif self.package_manager in ("dnf", "yum"):
-            cmd = [self.package_manager, "remove", package]
-            if assume_yes:
-                cmd.insert(2, "-y")
-
-        elif self.package_manager == "pacman":
-            cmd = ["pacman", "-R", package]
-            if assume_yes:
-                cmd.insert(2, "--noconfirm")
-
-        else:
+        backend = self._backend
+        if backend is None:
             self.logger.error(f"Unsupported package manager: {self.package_manager}")
             return False
 
+        cmd = [*backend.remove, *([backend.yes] if assume_yes else []), package]
         result = execute_command(cmd, sudo=True, check=False)
         return result.success
@@ -162,6 +162,9 @@ COMMAND_TIMEOUT_DEFAULT = 60
 COMMAND_TIMEOUT_LONG = 300
 COMMAND_TIMEOUT_INSTALL = 600
 
+# Package metadata younger than this is not refreshed before installing (seconds)
+PACKAGE_CACHE_TTL = 3600  # 1 hour
+
 # File Permissions
 PERM_PRIVATE_KEY = 0o600
 PERM_PUBLIC_KEY = 0o644
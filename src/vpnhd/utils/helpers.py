@@ -301,11 +301,9 @@ def calculate_file_hash(path: Path, algorithm: str = "sha256") -> Optional[str]:
         Optional[str]: Hex digest of file hash or None if error
     """
     try:
-        hash_obj = hashlib.new(algorithm)
-        with open(path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_obj.update(chunk)
-        return hash_obj.hexdigest()
+        # Unbuffered: file_digest reads straight into its own buffer with the GIL released
+        with open(path, "rb", buffering=0) as f:
+            return hashlib.file_digest(f, algorithm).hexdigest()
     except Exception:
         return None
 
@@ -9,6 +9,18 @@ from unittest.mock import MagicMock, Mock
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def clear_package_detection_cache():
+    """Reset the cached distro and package manager detection around every test."""
+    from vpnhd.system.packages import _detect_distro_cached, _get_package_manager_cached
+
+    _detect_distro_cached.cache_clear()
+    _get_package_manager_cached.cache_clear()
+    yield
+    _detect_distro_cached.cache_clear()
+    _get_package_manager_cached.cache_clear()
+
+
 @pytest.fixture
 def temp_dir():
     """Provide a temporary directory for test files."""
@@ -506,8 +506,10 @@ class TestRobustnessAndRecovery:
         mock_check = mocker.patch("vpnhd.system.packages.check_command_exists", return_value=True)
         mock_cmd = mocker.patch("vpnhd.system.packages.execute_command")
 
-        # Simulate: first package succeeds, second fails, third succeeds
+        # Simulate: batch fails, then first package succeeds, second fails, third succeeds
         responses = [
+            mocker.Mock(success=False, exit_code=1, stdout="", stderr=""),  # bulk check: none
+            mocker.Mock(success=False, exit_code=100, stdout="", stderr=""),  # batch FAILS
             mocker.Mock(success=False, exit_code=1, stdout="", stderr=""),  # pkg1 check
             mocker.Mock(success=True, exit_code=0, stdout="", stderr=""),  # pkg1 install
             mocker.Mock(success=False, exit_code=1, stdout="", stderr=""),  # pkg2 check
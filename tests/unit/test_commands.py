@@ -10,17 +10,32 @@ from pathlib import Path
 import pytest
 
 from vpnhd.system.commands import (
+    LARGE_INPUT_THRESHOLD,
     CommandResult,
     check_command_exists,
+    clear_command_cache,
+    clear_command_version_cache,
     command_exists_any,
     execute_command,
+    execute_command_async,
     execute_commands,
+    execute_commands_async,
     get_command_output,
     get_command_version,
     run_command_with_input,
 )
 
 
+@pytest.fixture(autouse=True)
+def reset_command_caches():
+    """Reset the command lookup caches around every test."""
+    clear_command_cache()
+    clear_command_version_cache()
+    yield
+    clear_command_cache()
+    clear_command_version_cache()
+
+
 class TestCommandResult:
     """Test CommandResult dataclass."""
 
@@ -169,6 +184,30 @@ class TestExecuteCommand:
         with pytest.raises(subprocess.CalledProcessError):
             execute_command(["false"], check=True)
 
+    def test_command_failure_default_returns_real_result(self, mocker):
+        """Test that without check the failing command's own exit code and output are kept."""
+        mock_run = mocker.patch("subprocess.run")
+        mock_run.return_value = mocker.Mock(returncode=2, stdout="partial", stderr="bad option")
+
+        result = execute_command(["ls", "--bogus"])
+
+        assert result.success is False
+        assert result.exit_code == 2
+        assert result.stdout == "partial"
+        assert result.stderr == "bad option"
+
+    def test_text_false_returns_raw_stdout(self, mocker):
+        """Test that text=False keeps stdout as bytes and still decodes stderr."""
+        mock_run = mocker.patch("subprocess.run")
+        mock_run.return_value = mocker.Mock(returncode=1, stdout=b"\xff\x00", stderr=b"warn")
+
+        result = execute_command(["cat", "/etc/shadow"], sudo=True, text=False)
+
+        assert mock_run.call_args.kwargs["text"] is False
+        assert result.stdout_bytes == b"\xff\x00"
+        assert result.stdout == ""
+        assert result.stderr == "warn"
+
     def test_capture_output_disabled(self, mocker):
         """Test that capture_output can be disabled."""
         mock_run = mocker.patch("subprocess.run")
@@ -226,6 +265,29 @@ class TestExecuteCommand:
         assert result.exit_code == -1
         assert "Unexpected error" in result.stderr
 
+    def test_fast_spawn_resolves_executable(self, mocker):
+        """Test that fast_spawn enables the posix_spawn-compatible options."""
+        mocker.patch("vpnhd.system.commands._resolve_executable", return_value="/usr/bin/wg")
+        mock_run = mocker.patch("subprocess.run")
+        mock_run.return_value = mocker.Mock(returncode=0, stdout="", stderr="")
+
+        execute_command(["wg", "show"], fast_spawn=True)
+
+        call_args = mock_run.call_args
+        assert call_args.args[0] == ["wg", "show"]
+        assert call_args.kwargs["executable"] == "/usr/bin/wg"
+        assert call_args.kwargs["close_fds"] is False
+        assert call_args.kwargs["shell"] is False
+
+    def test_fast_spawn_not_used_with_cwd(self, mocker, tmp_path):
+        """Test that fast_spawn is ignored when a working directory is set."""
+        mock_run = mocker.patch("subprocess.run")
+        mock_run.return_value = mocker.Mock(returncode=0, stdout="", stderr="")
+
+        execute_command(["ls"], cwd=tmp_path, fast_spawn=True)
+
+        assert "close_fds" not in mock_run.call_args.kwargs
+
 
 class TestExecuteCommands:
     """Test execute_commands function (batch execution)."""
@@ -284,55 +346,75 @@ class TestExecuteCommands:
         assert results[2].success is True
         assert mock_run.call_count == 3
 
+    def test_parallel_execution_preserves_order(self, mocker):
+        """Test that parallel execution returns results in input order."""
+        mock_run = mocker.patch("subprocess.run")
+        mock_run.side_effect = lambda args, **kwargs: mocker.Mock(
+            returncode=0 if args[-1] != "fail" else 1, stdout=args[-1], stderr=""
+        )
+
+        commands = ["echo a", "echo fail", "echo c"]
+        results = execute_commands(commands, stop_on_error=False, parallel=True)
+
+        assert [r.stdout for r in results] == ["a", "fail", "c"]
+        assert [r.success for r in results] == [True, False, True]
+        assert mock_run.call_count == 3
+
 
 class TestCheckCommandExists:
     """Test check_command_exists function."""
 
     def test_command_exists(self, mocker):
         """Test checking for existing command."""
+        mock_which = mocker.patch("shutil.which", return_value="/usr/bin/ls")
         mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = mocker.Mock(
-            returncode=0,
-            stdout="/usr/bin/ls",
-            stderr="",
-        )
 
         result = check_command_exists("ls")
 
         assert result is True
-        # Verify it uses shlex.quote for safety
-        call_args = mock_run.call_args
-        assert call_args.kwargs["shell"] is False
+        mock_which.assert_called_once_with("ls")
+        # PATH lookup happens in-process, no subprocess is spawned
+        mock_run.assert_not_called()
 
     def test_command_does_not_exist(self, mocker):
         """Test checking for non-existent command."""
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = mocker.Mock(
-            returncode=1,
-            stdout="",
-            stderr="not found",
-        )
+        mocker.patch("shutil.which", return_value=None)
 
         result = check_command_exists("nonexistent_command")
 
         assert result is False
 
-    def test_malicious_command_name_is_quoted(self, mocker):
-        """Test that malicious command names are safely quoted."""
+    def test_malicious_command_name_is_not_executed(self, mocker):
+        """Test that malicious command names are only looked up, never run."""
+        mock_which = mocker.patch("shutil.which", return_value=None)
         mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = mocker.Mock(
-            returncode=1,
-            stdout="",
-            stderr="",
-        )
 
         # Malicious command name with injection attempt
         malicious = "ls; rm -rf /"
         result = check_command_exists(malicious)
 
-        # Verify shlex.quote was used (command should be quoted)
-        # The implementation uses shlex.quote, so the malicious
-        # string will be treated as a single argument
+        assert result is False
+        mock_which.assert_called_once_with(malicious)
+        mock_run.assert_not_called()
+
+    def test_result_is_cached(self, mocker):
+        """Test that repeated lookups of the same command hit the cache."""
+        mock_which = mocker.patch("shutil.which", return_value="/usr/bin/wg")
+
+        assert check_command_exists("wg") is True
+        assert check_command_exists("wg") is True
+
+        mock_which.assert_called_once_with("wg")
+
+    def test_clear_command_cache_forgets_missing_command(self, mocker):
+        """Test that a command installed after a miss is found once the cache is cleared."""
+        mock_which = mocker.patch("shutil.which", side_effect=[None, "/usr/bin/wg"])
+
+        assert check_command_exists("wg") is False
+        clear_command_cache()
+
+        assert check_command_exists("wg") is True
+        assert mock_which.call_count == 2
 
 
 class TestRunCommandWithInput:
@@ -370,6 +452,19 @@ class TestRunCommandWithInput:
         assert call_args.args[0] == ["sudo", "tee", "/etc/config"]
         assert call_args.kwargs["shell"] is False
 
+    def test_large_input_sent_as_bytes(self, mocker):
+        """Test that large stdin payloads bypass text mode."""
+        mock_run = mocker.patch("subprocess.run")
+        mock_run.return_value = mocker.Mock(returncode=0, stdout=b"done", stderr=b"")
+        payload = "x" * (LARGE_INPUT_THRESHOLD + 1)
+
+        result = run_command_with_input(["wg", "setconf", "wg0", "/dev/stdin"], input_data=payload)
+
+        call_args = mock_run.call_args
+        assert call_args.kwargs["input"] == payload.encode()
+        assert call_args.kwargs["text"] is False
+        assert result.stdout == "done"
+
     def test_command_with_input_timeout(self, mocker):
         """Test timeout handling with input."""
         mock_run = mocker.patch("subprocess.run")
@@ -449,12 +544,8 @@ class TestCommandExistsAny:
 
     def test_at_least_one_exists(self, mocker):
         """Test when at least one command exists."""
-        mock_run = mocker.patch("subprocess.run")
-        # First command fails, second succeeds
-        mock_run.side_effect = [
-            mocker.Mock(returncode=1, stdout="", stderr=""),
-            mocker.Mock(returncode=0, stdout="/usr/bin/apt", stderr=""),
-        ]
+        # First command is missing, second exists
+        mocker.patch("shutil.which", side_effect=[None, "/usr/bin/apt"])
 
         result = command_exists_any(["apt-get", "apt"])
 
@@ -462,12 +553,7 @@ class TestCommandExistsAny:
 
     def test_none_exist(self, mocker):
         """Test when no commands exist."""
-        mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = mocker.Mock(
-            returncode=1,
-            stdout="",
-            stderr="",
-        )
+        mocker.patch("shutil.which", return_value=None)
 
         result = command_exists_any(["nonexistent1", "nonexistent2"])
 
@@ -480,17 +566,74 @@ class TestCommandExistsAny:
         assert result is False
 
 
+class TestExecuteCommandsAsync:
+    """Test execute_commands_async function."""
+
+    @pytest.mark.asyncio
+    async def test_sequential_stops_on_error(self, mocker):
+        """Test that sequential execution stops at the first failure."""
+        mock_run = mocker.patch("subprocess.run")
+        mock_run.side_effect = [
+            mocker.Mock(returncode=0, stdout=b"ok", stderr=b""),
+            mocker.Mock(returncode=1, stdout=b"", stderr=b"error"),
+        ]
+
+        results = await execute_commands_async(["echo a", "false", "echo c"])
+
+        assert len(results) == 2
+        assert results[0].success is True
+        assert results[1].success is False
+        assert mock_run.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_parallel_runs_all_in_order(self, mocker):
+        """Test that parallel execution runs every command and keeps input order."""
+        mock_run = mocker.patch("subprocess.run")
+        mock_run.side_effect = lambda cmd, **kwargs: mocker.Mock(
+            returncode=0 if cmd[0] != "false" else 1, stdout=cmd[-1].encode(), stderr=b""
+        )
+
+        results = await execute_commands_async(["echo a", "false", "echo c"], parallel=True)
+
+        assert [r.command for r in results] == ["echo a", "false", "echo c"]
+        assert [r.success for r in results] == [True, False, True]
+        assert results[2].stdout == "c"
+
+
+class TestExecuteCommandAsync:
+    """Test execute_command_async function."""
+
+    @pytest.mark.asyncio
+    async def test_command_failure_with_check_raises(self, mocker):
+        """Test that check=True raises exception on failure."""
+        mock_run = mocker.patch("subprocess.run")
+        mock_run.return_value = mocker.Mock(returncode=1, stdout=b"", stderr=b"error")
+
+        with pytest.raises(subprocess.CalledProcessError):
+            await execute_command_async(["false"], check=True)
+
+    @pytest.mark.asyncio
+    async def test_command_failure_default_returns_real_result(self, mocker):
+        """Test that without check the failing command's own exit code is kept."""
+        mock_run = mocker.patch("subprocess.run")
+        mock_run.return_value = mocker.Mock(returncode=3, stdout=b"", stderr=b"error")
+
+        result = await execute_command_async(["false"])
+
+        assert result.exit_code == 3
+        assert result.stderr == "error"
+
+
 class TestGetCommandVersion:
     """Test get_command_version function."""
 
     def test_get_version_success(self, mocker):
         """Test getting command version successfully."""
+        mocker.patch("shutil.which", return_value="/usr/bin/python3")
         mock_run = mocker.patch("subprocess.run")
-        # First call checks if command exists, second gets version
-        mock_run.side_effect = [
-            mocker.Mock(returncode=0, stdout="/usr/bin/python3", stderr=""),
-            mocker.Mock(returncode=0, stdout="Python 3.11.2\nmore info", stderr=""),
-        ]
+        mock_run.return_value = mocker.Mock(
+            returncode=0, stdout="Python 3.11.2\nmore info", stderr=""
+        )
 
         version = get_command_version("python3")
 
@@ -498,43 +641,47 @@ class TestGetCommandVersion:
 
     def test_get_version_custom_flag(self, mocker):
         """Test using custom version flag."""
+        mocker.patch("shutil.which", return_value="/usr/bin/gcc")
         mock_run = mocker.patch("subprocess.run")
-        mock_run.side_effect = [
-            mocker.Mock(returncode=0, stdout="/usr/bin/gcc", stderr=""),
-            mocker.Mock(returncode=0, stdout="gcc version 11.3.0", stderr=""),
-        ]
+        mock_run.return_value = mocker.Mock(returncode=0, stdout="gcc version 11.3.0", stderr="")
 
         version = get_command_version("gcc", version_flag="-v")
 
         # Verify custom flag was used
-        call_args = mock_run.call_args_list[1]
+        call_args = mock_run.call_args
         assert call_args.args[0] == ["gcc", "-v"]
 
     def test_get_version_command_not_found(self, mocker):
         """Test when command doesn't exist."""
+        mocker.patch("shutil.which", return_value=None)
         mock_run = mocker.patch("subprocess.run")
-        mock_run.return_value = mocker.Mock(
-            returncode=1,
-            stdout="",
-            stderr="not found",
-        )
 
         version = get_command_version("nonexistent")
 
         assert version is None
+        mock_run.assert_not_called()
 
     def test_get_version_fails(self, mocker):
         """Test when version command fails."""
+        mocker.patch("shutil.which", return_value="/usr/bin/cmd")
         mock_run = mocker.patch("subprocess.run")
-        mock_run.side_effect = [
-            mocker.Mock(returncode=0, stdout="/usr/bin/cmd", stderr=""),
-            mocker.Mock(returncode=1, stdout="", stderr="error"),
-        ]
+        mock_run.return_value = mocker.Mock(returncode=1, stdout="", stderr="error")
 
         version = get_command_version("cmd")
 
         assert version is None
 
+    def test_get_version_is_cached(self, mocker):
+        """Test that repeated version queries reuse the first result."""
+        mocker.patch("shutil.which", return_value="/usr/bin/wg")
+        mock_run = mocker.patch("subprocess.run")
+        mock_run.return_value = mocker.Mock(returncode=0, stdout="wireguard-tools v1.0", stderr="")
+
+        assert get_command_version("wg") == "wireguard-tools v1.0"
+        assert get_command_version("wg") == "wireguard-tools v1.0"
+
+        assert mock_run.call_count == 1
+
 
 class TestCommandInjectionPrevention:
     """Comprehensive command injection prevention tests."""
@@ -0,0 +1,139 @@
+"""Tests for fail2ban configuration management."""
+
+import re
+
+import pytest
+
+from vpnhd.system.commands import CommandResult
+from vpnhd.system.fail2ban_config import Fail2banConfigManager
+
+# Stand-in for fail2ban's <ADDR> tag, good enough for the IPv4 lines below
+_ADDR = r"(?P<addr>\d+\.\d+\.\d+\.\d+)"
+
+
+def _written_filter(mocker, tmp_path) -> bytes:
+    """Run create_wireguard_jail and return the bytes written for the filter."""
+    mocker.patch("vpnhd.system.fail2ban_config.Path.mkdir")
+    mock_write = mocker.patch("vpnhd.system.fail2ban_config._write_if_changed", return_value=False)
+
+    manager = Fail2banConfigManager(jail_dir=str(tmp_path))
+    assert manager.create_wireguard_jail() is True
+
+    written = {path.name: data for (path, data), _ in mock_write.call_args_list}
+    return written["wireguard.conf"]
+
+
+class TestWireGuardFilter:
+    """Test the WireGuard filter written by create_wireguard_jail."""
+
+    def test_filter_regexes_written_verbatim(self, mocker, tmp_path):
+        """Test that the regex backslashes reach the filter file unchanged."""
+        lines = _written_filter(mocker, tmp_path).decode().splitlines()
+
+        assert (
+            r"prefregex = ^.*?kernel:[^:]*wireguard: (?:[^:\s]+: )?<F-CONTENT>.+</F-CONTENT>$"
+            in lines
+        )
+        assert r"failregex = ^Invalid handshake initiation from <ADDR>" in lines
+        assert (
+            r"            ^Handshake for peer \S+ did not complete after \d+ seconds, "
+            r"retrying from <ADDR>" in lines
+        )
+        assert "ignoreregex =" in lines
+
+    def test_filter_matches_kernel_log_lines(self, mocker, tmp_path):
+        """Test that prefregex plus failregex pick the address out of kernel lines."""
+        options = {}
+        for line in _written_filter(mocker, tmp_path).decode().splitlines():
+            key, sep, value = line.partition(" = ")
+            if sep:
+                options[key] = value
+            elif line.startswith(" ") and options:
+                options["failregex"] += "\n" + line.strip()
+
+        prefregex = re.compile(
+            options["prefregex"].replace("<F-CONTENT>", "(?P<content>").replace("</F-CONTENT>", ")")
+        )
+        failregexes = [
+            re.compile(regex.replace("<ADDR>", _ADDR)) for regex in options["failregex"].split("\n")
+        ]
+
+        def match(log_line):
+            pref = prefregex.match(log_line)
+            if not pref:
+                return None
+            for failregex in failregexes:
+                fail = failregex.match(pref.group("content"))
+                if fail:
+                    return fail.group("addr")
+            return None
+
+        assert (
+            match(
+                "Jan 1 00:00:00 host kernel: wireguard: wg0: Invalid handshake initiation from 203.0.113.5:51820"
+            )
+            == "203.0.113.5"
+        )
+        assert (
+            match(
+                "Jan 1 00:00:00 host kernel: [12.3] wireguard: wg0: Handshake for peer 1 "
+                "did not complete after 5 seconds, retrying from 198.51.100.7"
+            )
+            == "198.51.100.7"
+        )
+        assert match("Jan 1 00:00:00 host kernel: usb 1-1: new device") is None
+
+
+def _status_result(stdout: str) -> CommandResult:
+    """Build a successful `fail2ban-client status` result."""
+    return CommandResult(exit_code=0, stdout=stdout, stderr="", success=True, command="")
+
+
+def _jail_status(ips: str) -> str:
+    """Build `fail2ban-client status <jail>` output banning the given IPs."""
+    return (
+        "Status for the jail: test\n"
+        "|- Filter\n"
+        "|  |- Currently failed: 0\n"
+        "`- Actions\n"
+        f"   |- Currently banned: {len(ips.split())}\n"
+        f"   `- Banned IP list: {ips}\n"
+    )
+
+
+class TestBannedIps:
+    """Test get_banned_ips and get_banned_ips_by_jail."""
+
+    @pytest.fixture
+    def manager(self, mocker, tmp_path):
+        """Fail2banConfigManager whose status queries report three jails, one without bans."""
+        mocker.patch(
+            "vpnhd.system.fail2ban_config.execute_command",
+            return_value=_status_result(
+                "Status\n|- Number of jail: 3\n`- Jail list: sshd, wg, x\n"
+            ),
+        )
+        mocker.patch(
+            "vpnhd.system.fail2ban_config.execute_command_pool",
+            return_value=[
+                _status_result(_jail_status("192.0.2.1 192.0.2.2")),
+                _status_result(_jail_status("198.51.100.9")),
+                _status_result(_jail_status("")),
+            ],
+        )
+        return Fail2banConfigManager(jail_dir=str(tmp_path))
+
+    def test_get_banned_ips_returns_one_dict_per_ip(self, manager):
+        """Test that get_banned_ips keeps its list-of-dicts shape."""
+        assert manager.get_banned_ips() == [
+            {"jail": "sshd", "ip": "192.0.2.1"},
+            {"jail": "sshd", "ip": "192.0.2.2"},
+            {"jail": "wg", "ip": "198.51.100.9"},
+        ]
+
+    def test_get_banned_ips_by_jail_groups_addresses(self, manager):
+        """Test that get_banned_ips_by_jail groups addresses and omits empty jails."""
+        assert manager.get_banned_ips_by_jail() == {
+            "sshd": ["192.0.2.1", "192.0.2.2"],
+            "wg": ["198.51.100.9"],
+        }
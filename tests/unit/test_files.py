@@ -0,0 +1,68 @@
+"""
+Unit tests for file operations.
+
+Tests the in-process copy paths used by copy_file and backup_file.
+"""
+
+import os
+
+from vpnhd.system.files import FileManager
+
+
+class TestCopyFile:
+    """Test FileManager.copy_file."""
+
+    def test_large_copy_preserves_content(self, tmp_path):
+        """Test that a copy above the in-kernel copy threshold is byte-identical."""
+        source = tmp_path / "source.bin"
+        destination = tmp_path / "destination.bin"
+        data = os.urandom(20 * 1024)
+        source.write_bytes(data)
+
+        assert FileManager().copy_file(source, destination) is True
+
+        assert destination.read_bytes() == data
+
+    def test_small_copy_preserves_content(self, tmp_path):
+        """Test that a small copy is byte-identical."""
+        source = tmp_path / "source.txt"
+        destination = tmp_path / "destination.txt"
+        source.write_text("[Interface]\n")
+
+        assert FileManager().copy_file(source, destination) is True
+
+        assert destination.read_text() == "[Interface]\n"
+
+    def test_copy_onto_itself_fails_without_truncating(self, tmp_path):
+        """Test that copying a file onto itself is refused and keeps its content."""
+        path = tmp_path / "wg0.conf"
+        data = os.urandom(20 * 1024)
+        path.write_bytes(data)
+
+        assert FileManager().copy_file(path, path) is False
+
+        assert path.read_bytes() == data
+
+
+class TestBackupFile:
+    """Test FileManager.backup_file."""
+
+    def test_backup_copies_content(self, tmp_path):
+        """Test that a backup holds the original content."""
+        path = tmp_path / "wg0.conf"
+        path.write_bytes(b"x" * (16 * 1024))
+
+        backup = FileManager().backup_file(path)
+
+        assert backup == tmp_path / "wg0.conf.backup"
+        assert backup.read_bytes() == path.read_bytes()
+
+    def test_empty_suffix_fails_without_truncating(self, tmp_path):
+        """Test that a backup onto the original file is refused."""
+        path = tmp_path / "wg0.conf"
+        data = os.urandom(20 * 1024)
+        path.write_bytes(data)
+
+        assert FileManager().backup_file(path, backup_suffix="") is None
+
+        assert path.read_bytes() == data
@@ -4,6 +4,9 @@ This test suite validates the security fixes in the system/packages.py module,
 particularly the prevention of command injection through package names.
 """
 
+import os
+import time
+
 import pytest
 
 from vpnhd.exceptions import ValidationError
@@ -140,7 +143,7 @@ class TestIsPackageInstalled:
                 pm.is_package_installed(dangerous)
 
     def test_debian_package_check_uses_dpkg(self, mocker):
-        """Test that Debian systems use dpkg for checking."""
+        """Test that Debian systems use dpkg-query for checking."""
         mock_open = mocker.patch("builtins.open", mocker.mock_open(read_data="ID=debian"))
         mock_check = mocker.patch("vpnhd.system.packages.check_command_exists", return_value=True)
         mock_cmd = mocker.patch("vpnhd.system.packages.execute_command")
@@ -151,9 +154,23 @@ class TestIsPackageInstalled:
 
         result = pm.is_package_installed("vim")
 
-        # Verify dpkg was used
+        # Verify dpkg-query was used
         call_args = mock_cmd.call_args
-        assert call_args[0][0] == ["dpkg", "-l", "vim"]
+        assert call_args[0][0] == ["dpkg-query", "-W", "-f=${Package}\t${Status}\n", "vim"]
+
+    def test_debian_removed_package_not_installed(self, mocker):
+        """Test that a removed-but-not-purged package agrees with installed_set."""
+        mocker.patch("builtins.open", mocker.mock_open(read_data="ID=debian"))
+        mocker.patch("vpnhd.system.packages.check_command_exists", return_value=True)
+        mock_cmd = mocker.patch("vpnhd.system.packages.execute_command")
+        mock_cmd.return_value = mocker.Mock(
+            success=True, exit_code=0, stdout="vim\tdeinstall ok config-files\n", stderr=""
+        )
+
+        pm = PackageManager()
+
+        assert pm.is_package_installed("vim") is False
+        assert pm.installed_set(["vim"]) == set()
 
     def test_fedora_package_check_uses_rpm(self, mocker):
         """Test that Fedora systems use rpm for checking."""
@@ -169,14 +186,16 @@ class TestIsPackageInstalled:
 
         # Verify rpm was used
         call_args = mock_cmd.call_args
-        assert call_args[0][0] == ["rpm", "-q", "vim"]
+        assert call_args[0][0] == ["rpm", "-q", "--qf", "%{NAME}\n", "vim"]
 
     def test_package_installed_true(self, mocker):
         """Test detecting installed package."""
         mock_open = mocker.patch("builtins.open", mocker.mock_open(read_data="ID=debian"))
         mock_check = mocker.patch("vpnhd.system.packages.check_command_exists", return_value=True)
         mock_cmd = mocker.patch("vpnhd.system.packages.execute_command")
-        mock_cmd.return_value = mocker.Mock(success=True, exit_code=0, stdout="", stderr="")
+        mock_cmd.return_value = mocker.Mock(
+            success=True, exit_code=0, stdout="vim\tinstall ok installed\n", stderr=""
+        )
 
         pm = PackageManager()
 
@@ -198,6 +217,57 @@ class TestIsPackageInstalled:
         assert result is False
 
 
+class TestInstalledSet:
+    """Test the bulk installed_set check."""
+
+    def test_debian_uses_single_dpkg_query(self, mocker):
+        """Test that one dpkg-query call reports every package."""
+        mocker.patch("builtins.open", mocker.mock_open(read_data="ID=debian"))
+        mocker.patch("vpnhd.system.packages.check_command_exists", return_value=True)
+        mock_exec = mocker.patch("vpnhd.system.packages.execute_command")
+        mock_exec.return_value.stdout = (
+            "vim\tinstall ok installed\ncurl\tdeinstall ok config-files\n"
+        )
+
+        pm = PackageManager()
+        installed = pm.installed_set(["vim", "curl", "git"])
+
+        assert installed == {"vim"}
+        assert mock_exec.call_count == 1
+        cmd = mock_exec.call_args[0][0]
+        assert cmd[0] == "dpkg-query"
+        assert cmd[-3:] == ["vim", "curl", "git"]
+
+    def test_invalid_package_name_rejected(self, mocker):
+        """Test that an invalid name raises before any command runs."""
+        mocker.patch("builtins.open", mocker.mock_open(read_data="ID=debian"))
+        mocker.patch("vpnhd.system.packages.check_command_exists", return_value=True)
+        mock_exec = mocker.patch("vpnhd.system.packages.execute_command")
+
+        pm = PackageManager()
+
+        with pytest.raises(ValidationError):
+            pm.installed_set(["vim", "bad; rm -rf /"])
+
+        mock_exec.assert_not_called()
+
+    def test_check_required_packages_preserves_order(self, mocker):
+        """Test check_required_packages splits the list with one query."""
+        mocker.patch("builtins.open", mocker.mock_open(read_data="ID=debian"))
+        mocker.patch("vpnhd.system.packages.check_command_exists", return_value=True)
+        mock_exec = mocker.patch("vpnhd.system.packages.execute_command")
+
+        pm = PackageManager()
+        required = pm.get_required_packages()
+        mock_exec.return_value.stdout = f"{required[0]}\tinstall ok installed\n"
+
+        installed, missing = pm.check_required_packages()
+
+        assert installed == [required[0]]
+        assert missing == required[1:]
+        assert mock_exec.call_count == 1
+
+
 class TestInstallPackage:
     """Test install_package method (CRITICAL for security)."""
 
@@ -343,14 +413,42 @@ class TestInstallPackages:
         assert len(successful) == 3
         assert len(failed) == 0
 
+    def test_successful_install_clears_command_cache(self, mocker):
+        """Test that commands cached as missing are looked up again after install."""
+        _ = mocker.patch("builtins.open", mocker.mock_open(read_data="ID=debian"))
+        _ = mocker.patch("vpnhd.system.packages.check_command_exists", return_value=True)
+        mock_clear = mocker.patch("vpnhd.system.packages.clear_command_cache")
+        mock_cmd = mocker.patch("vpnhd.system.packages.execute_command")
+        mock_cmd.return_value = mocker.Mock(success=True, exit_code=0, stdout="", stderr="")
+
+        pm = PackageManager()
+        pm.install_packages(["wireguard-tools"])
+
+        mock_clear.assert_called_once()
+
+    def test_failed_install_keeps_command_cache(self, mocker):
+        """Test that a failed install leaves cached lookups alone."""
+        _ = mocker.patch("builtins.open", mocker.mock_open(read_data="ID=debian"))
+        _ = mocker.patch("vpnhd.system.packages.check_command_exists", return_value=True)
+        mock_clear = mocker.patch("vpnhd.system.packages.clear_command_cache")
+        mock_cmd = mocker.patch("vpnhd.system.packages.execute_command")
+        mock_cmd.return_value = mocker.Mock(success=False, exit_code=100, stdout="", stderr="")
+
+        pm = PackageManager()
+        pm.install_package("wireguard-tools")
+
+        mock_clear.assert_not_called()
+
     def test_install_with_one_failure(self, mocker):
         """Test batch install with one failure."""
         _ = mocker.patch("builtins.open", mocker.mock_open(read_data="ID=debian"))
         _ = mocker.patch("vpnhd.system.packages.check_command_exists", return_value=True)
         mock_cmd = mocker.patch("vpnhd.system.packages.execute_command")
 
-        # First package succeeds, second fails, third succeeds
+        # Batch install fails, then first package succeeds, second fails, third succeeds
         mock_cmd.side_effect = [
+            mocker.Mock(success=False, exit_code=1, stdout="", stderr=""),  # Bulk check: none
+            mocker.Mock(success=False, exit_code=100, stdout="", stderr=""),  # Batch: failure
             mocker.Mock(success=False, exit_code=1, stdout="", stderr=""),  # Check 1: not installed
             mocker.Mock(success=True, exit_code=0, stdout="", stderr=""),  # Install 1: success
             mocker.Mock(success=False, exit_code=1, stdout="", stderr=""),  # Check 2: not installed
@@ -368,6 +466,30 @@ class TestInstallPackages:
         assert len(failed) == 1
         assert "nonexistent" in failed
 
+    def test_install_missing_packages_in_single_command(self, mocker):
+        """Test that missing packages are installed with one package manager call."""
+        _ = mocker.patch("builtins.open", mocker.mock_open(read_data="ID=debian"))
+        _ = mocker.patch("vpnhd.system.packages.check_command_exists", return_value=True)
+        mock_cmd = mocker.patch("vpnhd.system.packages.execute_command")
+        mock_cmd.side_effect = [
+            # Bulk check: only vim is installed
+            mocker.Mock(
+                success=False, exit_code=1, stdout="vim\tinstall ok installed\n", stderr=""
+            ),
+            mocker.Mock(success=True, exit_code=0, stdout="", stderr=""),  # Batch install
+        ]
+
+        pm = PackageManager()
+        pm.package_manager = "apt"
+
+        successful, failed = pm.install_packages(["ufw", "vim", "fail2ban"])
+
+        assert sorted(successful) == ["fail2ban", "ufw", "vim"]
+        assert failed == []
+        assert mock_cmd.call_count == 2
+        assert mock_cmd.call_args_list[0][0][0][0] == "dpkg-query"
+        assert mock_cmd.call_args[0][0] == ["apt", "install", "-y", "ufw", "fail2ban"]
+
     def test_install_packages_validates_all_first(self, mocker):
         """Test that all packages are validated before any installation."""
         _ = mocker.patch("builtins.open", mocker.mock_open(read_data="ID=debian"))
@@ -435,6 +557,54 @@ class TestUpdatePackageCache:
         assert result is True
 
 
+class TestInstallRequiredPackages:
+    """Test install_required_packages method."""
+
+    @pytest.mark.parametrize("cache_age,expect_update", [(60.0, False), (float("inf"), True)])
+    def test_cache_refreshed_only_when_stale(self, mocker, cache_age, expect_update):
+        """Test that fresh package metadata is not refreshed again."""
+        mocker.patch("builtins.open", mocker.mock_open(read_data="ID=debian"))
+        mocker.patch("vpnhd.system.packages.check_command_exists", return_value=True)
+
+        pm = PackageManager()
+        mocker.patch.object(pm, "check_required_packages", return_value=([], ["vim"]))
+        mocker.patch.object(pm, "install_packages", return_value=(["vim"], []))
+        mocker.patch.object(pm, "_cache_age_seconds", return_value=cache_age)
+        mock_update = mocker.patch.object(pm, "update_package_cache", return_value=True)
+
+        assert pm.install_required_packages() is True
+        assert mock_update.called is expect_update
+
+    @pytest.mark.parametrize("age,expect_update", [(60, False), (7200, True)])
+    @pytest.mark.parametrize("use_stamp", [True, False])
+    def test_apt_cache_age(self, mocker, tmp_path, age, expect_update, use_stamp):
+        """Test that apt freshness comes from the update stamp, else the index files."""
+        mocker.patch("builtins.open", mocker.mock_open(read_data="ID=debian"))
+        mocker.patch("vpnhd.system.packages.check_command_exists", return_value=True)
+
+        stamp = tmp_path / "update-success-stamp"
+        lists = tmp_path / "lists"
+        (lists / "partial").mkdir(parents=True)
+        index = lists / "deb.debian.org_debian_dists_stable_main_binary-amd64_Packages"
+        index.touch()
+        then = time.time() - age
+        if use_stamp:
+            stamp.touch()
+            os.utime(stamp, (then, then))
+        else:
+            os.utime(index, (then, then))
+        mocker.patch("vpnhd.system.packages._APT_UPDATE_STAMP", stamp)
+        mocker.patch("vpnhd.system.packages._APT_LISTS_DIR", lists)
+
+        pm = PackageManager()
+        mocker.patch.object(pm, "check_required_packages", return_value=([], ["vim"]))
+        mocker.patch.object(pm, "install_packages", return_value=(["vim"], []))
+        mock_update = mocker.patch.object(pm, "update_package_cache", return_value=True)
+
+        assert pm.install_required_packages() is True
+        assert mock_update.called is expect_update
+
+
 class TestRemovePackage:
     """Test remove_package method."""
 
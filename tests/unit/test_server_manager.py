@@ -0,0 +1,270 @@
+"""Tests for the multi-server manager."""
+
+import asyncio
+
+import pytest
+
+from vpnhd.server.manager import _PROBE_SEPARATOR, ServerManager
+from vpnhd.server.models import ServerConnection, ServerProfile
+
+
+def _profile(name: str, enabled: bool = True, tags=None) -> ServerProfile:
+    """Build a minimal server profile."""
+    return ServerProfile(
+        name=name,
+        connection=ServerConnection(host="10.0.0.1", key_path="/root/.ssh/id_ed25519"),
+        enabled=enabled,
+        tags=tags or [],
+    )
+
+
+@pytest.fixture
+def config(mocker):
+    """ConfigManager stand-in holding two saved servers."""
+    config = mocker.Mock()
+    config.get.return_value = {
+        "vpn1": _profile("vpn1").to_dict(),
+        "vpn2": _profile("vpn2").to_dict(),
+    }
+    return config
+
+
+@pytest.fixture
+def manager(config):
+    """ServerManager loaded from the stand-in config."""
+    return ServerManager(config)
+
+
+def _saved(config):
+    """Return the servers mapping passed to the last config.set call."""
+    key, servers = config.set.call_args[0]
+    assert key == "servers"
+    return servers
+
+
+class TestLoadServers:
+    """Test loading saved profiles."""
+
+    def test_invalid_interface_is_skipped(self, mocker):
+        """Test that a saved profile with an invalid interface name is not loaded."""
+        bad = _profile("bad").to_dict()
+        bad["vpn_interface"] = "wg0; reboot"
+        config = mocker.Mock()
+        config.get.return_value = {"vpn1": _profile("vpn1").to_dict(), "bad": bad}
+
+        manager = ServerManager(config)
+
+        assert list(manager.servers) == ["vpn1"]
+        assert [s.name for s in manager.list_servers()] == ["vpn1"]
+
+
+class TestProbeServer:
+    """Test parsing of the combined status probe output."""
+
+    @staticmethod
+    def _output(link: str, uptime: str, transfer: str) -> str:
+        sep = f"{_PROBE_SEPARATOR}\n"
+        return f"{link}{sep}{uptime}{sep}{transfer}"
+
+    @pytest.mark.asyncio
+    async def test_interface_up(self, manager, mocker):
+        """Test that link, uptime and per-peer counters are parsed."""
+        mock_run = mocker.patch.object(manager, "_run_command", mocker.AsyncMock())
+        mock_run.return_value = self._output(
+            "5: wg0: <POINTOPOINT,NOARP,UP,LOWER_UP> mtu 1420\n",
+            "12345.67 54321.00\n",
+            "peerA= 100 200\npeerB= 300 400\n",
+        )
+
+        probe = await manager._probe_server(manager.servers["vpn1"])
+
+        assert probe["vpn_running"] is True
+        assert probe["uptime"] == 12345
+        assert probe["active_clients"] == 2
+        assert probe["bytes_received"] == 400
+        assert probe["bytes_transmitted"] == 600
+        # One SSH exec covers every section
+        mock_run.assert_awaited_once()
+        command = mock_run.call_args[0][1]
+        assert "ip -o link show dev wg0 up" in command
+        assert "wg show wg0 transfer" in command
+
+    @pytest.mark.asyncio
+    async def test_interface_down_without_wg_output(self, manager, mocker):
+        """Test that an empty link section and missing wg output read as stopped."""
+        mocker.patch.object(
+            manager,
+            "_run_command",
+            mocker.AsyncMock(return_value=self._output("", "42.0 1.0\n", "")),
+        )
+
+        probe = await manager._probe_server(manager.servers["vpn1"])
+
+        assert probe["vpn_running"] is False
+        assert probe["uptime"] == 42
+        assert probe["active_clients"] == 0
+        assert probe["bytes_received"] == 0
+        assert probe["bytes_transmitted"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_command(self, manager, mocker):
+        """Test that a failed exec yields empty results instead of raising."""
+        mocker.patch.object(manager, "_run_command", mocker.AsyncMock(return_value=None))
+
+        probe = await manager._probe_server(manager.servers["vpn1"])
+
+        assert probe["output"] is None
+        assert probe["vpn_running"] is False
+        assert probe["uptime"] is None
+        assert probe["active_clients"] == 0
+
+
+class TestDirtyTracking:
+    """Test that saves re-serialize only changed profiles."""
+
+    def test_only_dirty_profiles_are_reserialized(self, manager, config, mocker):
+        """Test that untouched profiles are written from the saved copy."""
+        saved_vpn2 = manager._saved_servers["vpn2"]
+        mock_to_dict = mocker.patch.object(ServerProfile, "to_dict", return_value={"new": True})
+
+        manager.add_server(_profile("vpn3"))
+
+        mock_to_dict.assert_called_once_with()
+        servers = _saved(config)
+        assert servers["vpn3"] == {"new": True}
+        assert servers["vpn2"] is saved_vpn2
+        assert not manager._dirty_servers
+
+    def test_get_server_marks_profile_dirty(self, manager):
+        """Test that a profile handed out by get_server is written on the next save."""
+        manager.get_server("vpn1").description = "edited"
+
+        assert manager._dirty_servers == {"vpn1"}
+
+        manager._save_servers()
+        assert manager._saved_servers["vpn1"]["description"] == "edited"
+
+    def test_mark_dirty(self, manager, config):
+        """Test that mark_dirty queues a known profile and ignores unknown names."""
+        manager.servers["vpn2"].description = "edited elsewhere"
+
+        manager.mark_dirty("vpn2")
+        manager.mark_dirty("missing")
+
+        assert manager._dirty_servers == {"vpn2"}
+        manager._save_servers()
+        assert _saved(config)["vpn2"]["description"] == "edited elsewhere"
+
+    def test_filter_servers_does_not_mark_dirty(self, manager):
+        """Test that internal filtering leaves the dirty set alone."""
+        manager._filter_servers(enabled_only=True)
+
+        assert not manager._dirty_servers
+
+
+class TestFilterServers:
+    """Test the single-pass server filter."""
+
+    @pytest.fixture
+    def manager(self, mocker):
+        config = mocker.Mock()
+        config.get.return_value = {
+            "a": _profile("a", tags=["eu", "prod"]).to_dict(),
+            "b": _profile("b", enabled=False, tags=["eu"]).to_dict(),
+            "c": _profile("c", tags=["us"]).to_dict(),
+        }
+        return ServerManager(config)
+
+    def test_no_filters_returns_snapshot(self, manager):
+        """Test that an unfiltered call returns the shared snapshot tuple."""
+        assert manager._filter_servers() is manager._server_snapshot
+
+    def test_enabled_only(self, manager):
+        """Test that disabled servers are dropped."""
+        assert [s.name for s in manager._filter_servers(enabled_only=True)] == ["a", "c"]
+
+    def test_tags_match_any(self, manager):
+        """Test that a server matching any requested tag is kept."""
+        assert [s.name for s in manager._filter_servers(tags=["prod", "us"])] == ["a", "c"]
+
+    def test_enabled_and_tags(self, manager):
+        """Test that both filters apply together."""
+        assert [s.name for s in manager._filter_servers(enabled_only=True, tags=["eu"])] == ["a"]
+
+
+class TestRunBounded:
+    """Test the bounded fleet-wide probe runner."""
+
+    @pytest.mark.asyncio
+    async def test_results_in_order_with_failures(self, manager):
+        """Test that a raising probe counts as False without hiding the others."""
+        servers = [_profile(name) for name in ("s1", "s2", "s3", "s4")]
+
+        async def probe(profile):
+            await asyncio.sleep(0.01 if profile.name == "s1" else 0)
+            if profile.name in ("s2", "s4"):
+                raise RuntimeError("boom")
+            return True
+
+        results = await manager._run_bounded(servers, probe)
+
+        assert list(results.items()) == [("s1", True), ("s2", False), ("s3", True), ("s4", False)]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, manager):
+        """Test that no more than max_concurrent_probes probes run at once."""
+        manager.max_concurrent_probes = 2
+        running = 0
+        peak = 0
+
+        async def probe(profile):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return True
+
+        await manager._run_bounded([_profile(f"s{i}") for i in range(6)], probe)
+
+        assert peak == 2
+
+
+class TestRemoveServer:
+    """Test removing server profiles."""
+
+    @pytest.mark.asyncio
+    async def test_remove_server_closes_connection(self, manager, config, mocker):
+        """Test that the pooled connection is closed and the profile is dropped."""
+        conn = mocker.Mock()
+        conn.wait_closed = mocker.AsyncMock()
+        manager._ssh_connections["vpn1"] = conn
+
+        assert await manager.remove_server("vpn1") is True
+
+        conn.close.assert_called_once_with()
+        conn.wait_closed.assert_awaited_once_with()
+        assert "vpn1" not in manager._ssh_connections
+        assert "vpn1" not in manager.servers
+        assert [s.name for s in manager.list_servers()] == ["vpn2"]
+        assert "vpn1" not in _saved(config)
+
+    @pytest.mark.asyncio
+    async def test_remove_unknown_server(self, manager):
+        """Test that removing an unknown server fails."""
+        assert await manager.remove_server("missing") is False
+
+    def test_remove_server_sync(self, manager, config):
+        """Test that the synchronous wrapper removes the profile."""
+        assert manager.remove_server_sync("vpn2") is True
+
+        assert "vpn2" not in manager.servers
+        assert "vpn2" not in _saved(config)
+
+    @pytest.mark.asyncio
+    async def test_remove_server_sync_inside_running_loop(self, manager):
+        """Test that the synchronous wrapper refuses to run inside an event loop."""
+        with pytest.raises(RuntimeError, match="running event loop"):
+            manager.remove_server_sync("vpn1")
+
+        assert "vpn1" in manager.servers
@@ -0,0 +1,98 @@
+"""Tests for multi-server data model validation."""
+
+import pytest
+from pydantic import ValidationError
+
+from vpnhd.server.models import ServerConnection, ServerGroup, ServerProfile
+
+
+class TestServerConnectionHost:
+    """Test ServerConnection host validation."""
+
+    @pytest.mark.parametrize(
+        "host", ["vpn.example.com", "my-host", "10.0.0.1", "::1", "2001:db8::1"]
+    )
+    def test_valid_hosts_accepted(self, host):
+        """Test that ASCII hostnames and IP literals are accepted."""
+        assert ServerConnection(host=host).host == host
+
+    @pytest.mark.parametrize(
+        "host",
+        [
+            "",
+            "bad host",
+            "host;rm",
+            "ünïcode.example",  # IDNs must be given in their xn-- form
+            "999.1.1.1",  # Shaped like an IPv4 address, but not one
+            "2001:db8::zz",
+        ],
+    )
+    def test_invalid_hosts_rejected(self, host):
+        """Test that non-ASCII hostnames and malformed IP literals are rejected."""
+        with pytest.raises(ValidationError):
+            ServerConnection(host=host)
+
+
+class TestServerAndGroupNames:
+    """Test ServerProfile and ServerGroup name validation."""
+
+    @pytest.mark.parametrize("name", ["vpn-1", "home_server", "VPN2"])
+    def test_valid_server_names_accepted(self, name):
+        """Test that ASCII letters, digits, hyphens and underscores are accepted."""
+        profile = ServerProfile(name=name, connection=ServerConnection(host="10.0.0.1"))
+        assert profile.name == name
+
+    @pytest.mark.parametrize("name", ["", "vpn 1", "a/b", "sérveur", "vpn١"])
+    def test_invalid_server_names_rejected(self, name):
+        """Test that spaces, separators and non-ASCII characters are rejected."""
+        with pytest.raises(ValidationError):
+            ServerProfile(name=name, connection=ServerConnection(host="10.0.0.1"))
+
+    @pytest.mark.parametrize("name", ["Home Lab", "eu-west_1"])
+    def test_valid_group_names_accepted(self, name):
+        """Test that group names may also contain spaces."""
+        assert ServerGroup(name=name).name == name
+
+    @pytest.mark.parametrize("name", ["", "a;b", "grüppe"])
+    def test_invalid_group_names_rejected(self, name):
+        """Test that punctuation and non-ASCII characters are rejected."""
+        with pytest.raises(ValidationError):
+            ServerGroup(name=name)
+
+
+class TestVpnInterface:
+    """Test ServerProfile.vpn_interface validation."""
+
+    @pytest.mark.parametrize("interface", ["wg0", "wg-home", "wg_1", "wg0.100", "a" * 15])
+    def test_valid_interfaces_accepted(self, interface):
+        """Test that Linux interface names of up to 15 characters are accepted."""
+        profile = ServerProfile(
+            name="vpn", connection=ServerConnection(host="10.0.0.1"), vpn_interface=interface
+        )
+        assert profile.vpn_interface == interface
+
+    @pytest.mark.parametrize(
+        "interface", ["", "a" * 16, "wg0; reboot", "wg0 up", "$(id)", "wg/0", "wgö"]
+    )
+    def test_invalid_interfaces_rejected(self, interface):
+        """Test that over-long names and shell metacharacters are rejected."""
+        with pytest.raises(ValidationError):
+            ServerProfile(
+                name="vpn", connection=ServerConnection(host="10.0.0.1"), vpn_interface=interface
+            )
+
+    def test_trusted_load_accepts_valid_interface(self):
+        """Test that a saved profile with a valid interface loads on the trusted path."""
+        data = ServerProfile(
+            name="vpn", connection=ServerConnection(host="10.0.0.1"), vpn_interface="wg1"
+        ).to_dict()
+
+        assert ServerProfile.from_dict(data, trusted=True).vpn_interface == "wg1"
+
+    def test_trusted_load_rejects_invalid_interface(self):
+        """Test that a hand-edited saved profile cannot smuggle in an interface name."""
+        data = ServerProfile(name="vpn", connection=ServerConnection(host="10.0.0.1")).to_dict()
+        data["vpn_interface"] = "wg0; reboot"
+
+        with pytest.raises(ValueError, match="Invalid interface name"):
+            ServerProfile.from_dict(data, trusted=True)
@@ -0,0 +1,300 @@
+"""Tests for configuration synchronization between servers."""
+
+import asyncio
+import shlex
+import subprocess
+
+import pytest
+import yaml
+
+from vpnhd.server.models import SyncConfiguration
+from vpnhd.server.sync import ConfigSync, _config_hash
+
+
+@pytest.fixture
+def server_manager(mocker):
+    """ServerManager stand-in whose remote commands are async mocks."""
+    manager = mocker.Mock()
+    manager.execute_command = mocker.AsyncMock()
+    manager.execute_command_bytes = mocker.AsyncMock()
+    return manager
+
+
+class TestGetServerConfig:
+    """Test reading and parsing remote configurations."""
+
+    @pytest.mark.asyncio
+    async def test_mixed_key_types_are_returned(self, server_manager):
+        """Test that a mapping mixing int and str keys still loads."""
+        server_manager.execute_command.return_value = "1: one\nx: two\n"
+
+        config = await ConfigSync(server_manager).get_server_config("vpn1")
+
+        assert config == {1: "one", "x": "two"}
+
+    @pytest.mark.asyncio
+    async def test_mixed_key_types_are_hashed(self, server_manager):
+        """Test that conflict detection hashes configs with mixed key types."""
+        server_manager.execute_command.return_value = "1: one\nx: two\n"
+
+        result = await ConfigSync(server_manager).detect_config_conflicts(["vpn1", "vpn2"])
+
+        assert result["has_conflicts"] is False
+        assert result["config_hashes"]["vpn1"] == _config_hash({1: "one", "x": "two"})
+        assert result["config_hashes"]["vpn1"] == result["config_hashes"]["vpn2"]
+
+
+class TestGetServerConfigHash:
+    """Test the formatting-independent configuration hash."""
+
+    @pytest.mark.asyncio
+    async def test_formatting_changes_keep_the_hash(self, server_manager):
+        """Test that key order, flow style and comments do not change the hash."""
+        sync = ConfigSync(server_manager)
+
+        server_manager.execute_command_bytes.return_value = (
+            b"network:\n  subnet: 10.66.0.0/24\n  port: 51820\nclients: [laptop, phone]\n"
+        )
+        block_hash = await sync.get_server_config_hash("vpn1")
+
+        server_manager.execute_command_bytes.return_value = (
+            b"# reformatted\nclients:\n  - laptop\n  - phone\n"
+            b"network: {port: 51820, subnet: 10.66.0.0/24}\n"
+        )
+        flow_hash = await sync.get_server_config_hash("vpn1")
+
+        assert block_hash is not None
+        assert block_hash == flow_hash
+
+    @pytest.mark.asyncio
+    async def test_value_change_changes_the_hash(self, server_manager):
+        """Test that a real setting change produces a different hash."""
+        sync = ConfigSync(server_manager)
+
+        server_manager.execute_command_bytes.return_value = b"network:\n  port: 51820\n"
+        before = await sync.get_server_config_hash("vpn1")
+
+        server_manager.execute_command_bytes.return_value = b"network:\n  port: 51821\n"
+        after = await sync.get_server_config_hash("vpn1")
+
+        assert before != after
+
+    @pytest.mark.asyncio
+    async def test_matches_conflict_detection_hash(self, server_manager):
+        """Test that both hash entry points agree for the same configuration."""
+        content = "network:\n  port: 51820\n"
+        server_manager.execute_command_bytes.return_value = content.encode()
+        server_manager.execute_command.return_value = content
+        sync = ConfigSync(server_manager)
+
+        result = await sync.detect_config_conflicts(["vpn1"])
+
+        assert result["config_hashes"]["vpn1"] == await sync.get_server_config_hash("vpn1")
+
+
+class TestPushConfigToServer:
+    """Test the single-command heredoc push."""
+
+    @pytest.mark.asyncio
+    async def test_single_heredoc_command(self, server_manager):
+        """Test that the config is written with one quoted, heredoc-fed command."""
+        server_manager.execute_command.return_value = ""
+
+        assert await ConfigSync(server_manager).push_config_to_server("vpn1", {"a": 1}) is True
+
+        server_manager.execute_command.assert_awaited_once()
+        command = server_manager.execute_command.call_args[0][1]
+        first_line, body = command.split("\n", 1)
+        tokens = shlex.split(first_line)
+        temp_path = tokens[6]
+        assert tokens == [
+            "mkdir",
+            "-p",
+            "~/.config/vpnhd",
+            "&&",
+            "cat",
+            ">",
+            temp_path,
+            "<<",
+            "VPNHD_CONFIG_EOF",
+            "&&",
+            "mv",
+            temp_path,
+            "~/.config/vpnhd/config.yaml",
+        ]
+        assert temp_path.startswith("/tmp/vpnhd_config_")
+        assert f"> {shlex.quote(temp_path)} " in first_line
+        assert body == "a: 1\n\nVPNHD_CONFIG_EOF"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "config",
+        [
+            {"notes": "first\nVPNHD_CONFIG_EOF\nlast", "clients": ["VPNHD_CONFIG_EOF"]},
+            # Dumps to a document whose first line is exactly the terminator
+            "VPNHD_CONFIG_EOF",
+        ],
+    )
+    async def test_content_containing_terminator(self, server_manager, tmp_path, config):
+        """Test that content containing the terminator is written intact."""
+        server_manager.execute_command.return_value = ""
+
+        await ConfigSync(server_manager).push_config_to_server("vpn1", config)
+        command = server_manager.execute_command.call_args[0][1]
+
+        # Run the command as the remote shell would, with HOME in a temp dir
+        subprocess.run(["sh", "-c", command], env={"HOME": str(tmp_path)}, check=True)
+        written = (tmp_path / ".config" / "vpnhd" / "config.yaml").read_text()
+        assert yaml.safe_load(written) == config
+
+    @pytest.mark.asyncio
+    async def test_failed_command(self, server_manager):
+        """Test that a failed remote command reports failure."""
+        server_manager.execute_command.return_value = None
+
+        assert await ConfigSync(server_manager).push_config_to_server("vpn1", {"a": 1}) is False
+
+
+class TestSyncTargets:
+    """Test concurrent per-target sync."""
+
+    @pytest.mark.asyncio
+    async def test_excluded_and_failing_targets(self, server_manager):
+        """Test that excluded targets are skipped and a raising target counts as failed."""
+        sync = ConfigSync(server_manager, SyncConfiguration(excluded_servers=["vpn2"]))
+        called = []
+
+        async def sync_one(target):
+            called.append(target)
+            if target == "vpn3":
+                raise RuntimeError("boom")
+            return True
+
+        results = await sync._sync_targets(["vpn1", "vpn2", "vpn3", "vpn4"], sync_one)
+
+        assert results == {"vpn1": True, "vpn2": False, "vpn3": False, "vpn4": True}
+        assert sorted(called) == ["vpn1", "vpn3", "vpn4"]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, server_manager):
+        """Test that no more than max_concurrent_syncs operations run at once."""
+        sync = ConfigSync(server_manager)
+        sync.max_concurrent_syncs = 3
+        running = 0
+        peak = 0
+
+        async def sync_one(target):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return True
+
+        results = await sync._sync_targets([f"vpn{i}" for i in range(8)], sync_one)
+
+        assert all(results.values())
+        assert peak == 3
+
+
+class TestSkipInSyncTargets:
+    """Test that targets already holding the source data are not pushed to."""
+
+    @pytest.fixture
+    def sync(self, server_manager, mocker):
+        sync = ConfigSync(server_manager)
+        mocker.patch.object(sync, "push_config_to_server", mocker.AsyncMock(return_value=True))
+        return sync
+
+    @staticmethod
+    def _configs(sync, mocker, configs):
+        mocker.patch.object(
+            sync, "get_server_config", mocker.AsyncMock(side_effect=lambda name: configs[name])
+        )
+
+    @pytest.mark.asyncio
+    async def test_clients_already_in_sync(self, sync, mocker):
+        """Test that only the target with different clients is pushed to."""
+        clients = {"laptop": {"ip": "10.66.66.2"}}
+        self._configs(
+            sync,
+            mocker,
+            {
+                "src": {"clients": clients},
+                "same": {"clients": dict(clients), "port": 1},
+                "stale": {"clients": {}, "port": 2},
+            },
+        )
+
+        results = await sync.sync_client_configs("src", ["same", "stale"])
+
+        assert results == {"same": True, "stale": True}
+        sync.push_config_to_server.assert_awaited_once_with(
+            "stale", {"clients": clients, "port": 2}
+        )
+
+    @pytest.mark.asyncio
+    async def test_settings_already_in_sync(self, sync, mocker):
+        """Test that a target already holding the settings is not pushed to."""
+        self._configs(
+            sync,
+            mocker,
+            {
+                "src": {"port": 51820, "clients": {"a": 1}},
+                "same": {"port": 51820, "clients": {}},
+                "stale": {"port": 51821},
+            },
+        )
+
+        results = await sync.sync_server_settings("src", ["same", "stale"])
+
+        assert results == {"same": True, "stale": True}
+        sync.push_config_to_server.assert_awaited_once_with("stale", {"port": 51820})
+
+
+class TestConfigDifferences:
+    """Test the iterative configuration diff."""
+
+    def test_nested_lists_and_added_removed_keys(self, server_manager):
+        """Test the reported differences and their order.
+
+        Top-level differences come first; differing nested sections are then
+        walked last-found first, and equal sections are not descended into.
+        """
+        config1 = {
+            "a": 1,
+            "net": {"port": 1, "dns": ["1.1.1.1"], "deep": {"x": 1, "y": 2}},
+            "only1": True,
+            "same": {"k": 1},
+            "z": {"q": 1},
+        }
+        config2 = {
+            "a": 2,
+            "net": {"port": 1, "dns": ["9.9.9.9"], "deep": {"x": 1, "y": 3}, "mtu": 1420},
+            "same": {"k": 1},
+            "z": {"q": 2},
+            "only2": [1],
+        }
+
+        diffs = ConfigSync(server_manager)._find_config_differences(config1, config2)
+
+        assert diffs == [
+            {"path": "a", "type": "value_mismatch", "value1": 1, "value2": 2},
+            {"path": "only1", "type": "missing_in_second", "value1": True},
+            {"path": "only2", "type": "missing_in_first", "value2": [1]},
+            {"path": "z.q", "type": "value_mismatch", "value1": 1, "value2": 2},
+            {
+                "path": "net.dns",
+                "type": "value_mismatch",
+                "value1": ["1.1.1.1"],
+                "value2": ["9.9.9.9"],
+            },
+            {"path": "net.mtu", "type": "missing_in_first", "value2": 1420},
+            {"path": "net.deep.y", "type": "value_mismatch", "value1": 2, "value2": 3},
+        ]
+
+    def test_equal_configs(self, server_manager):
+        """Test that equal configs yield no differences."""
+        config = {"net": {"dns": ["1.1.1.1"]}, "clients": {}}
+
+        assert ConfigSync(server_manager)._find_config_differences(config, dict(config)) == []
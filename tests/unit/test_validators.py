@@ -53,6 +53,10 @@ class TestHostnameValidator:
         assert not is_valid_hostname("server-")  # Can't end with hyphen
         assert not is_valid_hostname("a" * 64)  # Label too long
         assert not is_valid_hostname("a" * 254)  # Hostname too long
+        assert not is_valid_hostname("server.")  # Empty trailing label
+        assert not is_valid_hostname("server..local")  # Empty inner label
+        assert not is_valid_hostname("server\n")  # Trailing newline
+        assert is_valid_hostname(".".join(["a" * 63] * 3))  # Max label length
 
     def test_injection_attempts(self):
         """Test that command injection attempts are rejected."""
@@ -203,6 +207,25 @@ class TestIPValidators:
         assert not is_valid_ip("1.256.1.1")
         assert not is_valid_ip("1.1.256.1")
         assert not is_valid_ip("1.1.1.256")
+        assert not is_valid_ip("01.1.1.1")  # Leading zeros are ambiguous
+
+    def test_ipv6_addresses(self):
+        """Test IPv6 handling in the generic and IPv4-only validators."""
+        assert is_valid_ip("2001:db8::1")
+        assert is_valid_ip("::1")
+        assert is_valid_ip("::ffff:192.168.1.1")
+        assert not is_valid_ip("2001:db8::1::2")
+        assert not is_valid_ipv4("2001:db8::1")
+
+    def test_scoped_ipv6_addresses(self):
+        """Test that IPv6 zone suffixes must name an interface or index."""
+        assert is_valid_ip("fe80::1%eth0")
+        assert is_valid_ip("fe80::1%2")
+        assert not is_valid_ip("fe80::1%")
+        assert not is_valid_ip("fe80::1%eth0%1")
+        assert not is_valid_ip("fe80::1%eth0; reboot")
+        assert not is_valid_ip("192.168.1.1%eth0")
+        assert not is_valid_ipv4("192.168.1.1%eth0")
 
 
 class TestCIDRValidator:
@@ -272,6 +295,8 @@ class TestMACAddressValidator:
         assert not is_valid_mac_address("00:11:22:33:44")  # Too short
         assert not is_valid_mac_address("00:11:22:33:44:55:66")  # Too long
         assert not is_valid_mac_address("GG:11:22:33:44:55")  # Invalid hex
+        assert not is_valid_mac_address("00:11:22:33:44:55\n")  # Trailing newline
+        assert not is_valid_mac_address("")
 
 
 class TestPathSafetyValidator:
@@ -288,6 +313,23 @@ class TestPathSafetyValidator:
         assert not is_safe_path("../../etc/passwd")
         assert not is_safe_path("../../../etc/shadow")
         assert not is_safe_path("/tmp/../../etc/passwd")
+        assert not is_safe_path("~/.ssh/id_ed25519")
+
+    def test_dotted_names_are_not_traversal(self):
+        """Test that '..' inside a file or directory name is allowed."""
+        assert is_safe_path("/opt/vpnhd..backup/wg0.conf")
+        assert is_safe_path("/etc/wireguard/wg0.conf..bak")
+
+    def test_allowed_roots(self, tmp_path):
+        """Test confinement of resolved paths to allowed directories."""
+        root = tmp_path / "wireguard"
+        root.mkdir()
+        escape = root / "link"
+        escape.symlink_to(tmp_path)
+
+        assert is_safe_path(str(root / "wg0.conf"), allowed_roots=[root])
+        assert not is_safe_path("/etc/passwd", allowed_roots=[root])
+        assert not is_safe_path(str(escape / "secret"), allowed_roots=[root])
 
 
 class TestWireGuardKeyValidator:
@@ -303,6 +345,8 @@ class TestWireGuardKeyValidator:
         assert not is_valid_wireguard_key("tooshort")
         assert not is_valid_wireguard_key("a" * 44)  # Wrong characters
         assert not is_valid_wireguard_key("a" * 100)  # Too long
+        assert not is_valid_wireguard_key("A" * 42 + "==")  # Decodes to 31 bytes
+        assert not is_valid_wireguard_key("A" * 42 + "!=")  # Not base64
 
 
 class TestSanitizers:
@@ -417,6 +461,26 @@ class TestValidatorEdgeCases:
         assert not is_valid_cidr("")
         assert not is_valid_mac_address("")
 
+    def test_repeated_validation_is_cached(self):
+        """Test that pure validators serve repeated inputs from the cache."""
+        is_valid_hostname.cache_clear()
+
+        assert is_valid_hostname("vpn-server.local")
+        assert is_valid_hostname("vpn-server.local")
+
+        info = is_valid_hostname.cache_info()
+        assert info.hits == 1
+        assert info.misses == 1
+
+    def test_unhashable_input_is_rejected(self):
+        """Test that cached validators reject unhashable input instead of raising."""
+        assert not is_valid_hostname(["vpn-server.local"])
+        assert not is_valid_ip(["192.168.1.1"])
+        assert not is_valid_ipv4({"ip": "192.168.1.1"})
+        assert not is_valid_cidr(["10.0.0.0/24"])
+        assert not is_valid_mac_address(["00:11:22:33:44:55"])
+        assert not validate_email(["admin@example.com"])
+
     def test_none_values(self):
         """Test that validators handle None values gracefully."""
         # Should not crash, should return False or handle appropriately